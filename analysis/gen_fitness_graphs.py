@@ -14,9 +14,9 @@ log_file_paths = \
 
 for log_file_index in range(len(log_file_paths)):
     with open(log_file_paths[log_file_index], 'r') as log_file:
-        # Create a list of lines from the log file, disregarding all config parmeters and empty lines
+        # Create a list of lines from the log file, disregarding all config parmeters, comments and empty lines
         log_file = log_file.read().split('\n')
-        log_file = [line for line in log_file[log_file.index('Run 1'):] if not line == '']
+        log_file = [line for line in log_file[log_file.index('Run 1'):] if not line == '' and not line[0] == '#']
 
         # key: evaluation number, value: [average fitness, local best fitness]
         eval_dict = {}
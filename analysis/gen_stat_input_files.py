@@ -4,9 +4,9 @@ import analysis_config as config
 
 for i in range(len(config.log_file_paths)):
     with open(config.log_file_paths[i], 'r') as log_file:
-        # Create a list of lines from the log file, disregarding all config parmeters and empty lines
+        # Create a list of lines from the log file, disregarding all config parmeters, comments and empty lines
         log_text = log_file.read().split('\n')
-        log_text = [line for line in log_text[log_text.index('Run 1'):] if not line == '']
+        log_text = [line for line in log_text[log_text.index('Run 1'):] if not line == '' and not line[0] == '#']
 
         last_best_fits = []
         all_best_fits = []
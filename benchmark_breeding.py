@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+import controllers.pacman_controller as pacman_cont_class
+import controllers.tree as tree_class
+import copy
+import random
+import time
+import util.args as args_class
+import util.config as config_class
+
+
+# Constant declarations
+NUM_PARENTS = 20
+NUM_CHILDREN = 5000
+SEED = 'benchmark breeding'
+
+
+def legacy_copy(pacman_cont):
+    """Clones pacman_cont the way PacmanController.__copy__() did before nodes
+    were shared copy-on-write: a random state evaluator is initialized only to
+    be replaced by a node-by-node copy of the parent's.
+    """
+    other = type(pacman_cont)(pacman_cont.config)
+    other.state_evaluator = tree_class.Tree(pacman_cont.config)
+    other.state_evaluator.list[:] = [tree_class.TreeNode(node.index, node.value) if node else None for node in pacman_cont.state_evaluator]
+    other.state_evaluator.live_indices = list(pacman_cont.state_evaluator.live_indices)
+
+    # The copied state evaluator is identical, so its compiled form can be shared
+    other.compiled_state_evaluator = pacman_cont.compiled_state_evaluator
+
+    return other
+
+
+def time_clone(parents, clone):
+    """Returns the per-child time of cloning NUM_CHILDREN children from parents
+    with clone, as done once per child by GPDriver.recombine().
+    """
+    start_time = time.perf_counter()
+
+    for index in range(NUM_CHILDREN):
+        child = clone(parents[index % NUM_PARENTS])
+
+    return (time.perf_counter() - start_time) / NUM_CHILDREN
+
+
+def time_breed(parents, clone, max_tree_height):
+    """Returns the per-child time of breeding NUM_CHILDREN children from parents
+    with clone, using the operations of GPDriver.recombine() and GPDriver.mutate()
+    (tree limit checks aside): sub-tree crossover followed by sub-tree mutation.
+    """
+    # Note: both clone paths start from the same seed, but the legacy one also
+    # draws random numbers while cloning, so their crossover and mutation points differ
+    random.seed(SEED)
+    start_time = time.perf_counter()
+
+    for _ in range(NUM_CHILDREN):
+        parent_a = parents[random.randrange(0, NUM_PARENTS)]
+        parent_b = parents[random.randrange(0, NUM_PARENTS)]
+
+        # Sub-tree crossover
+        crossover_index_a = parent_a.state_evaluator.get_rand_live_index()
+        crossover_index_b = parent_b.state_evaluator.get_rand_live_index()
+
+        child = clone(parent_a)
+        child.state_evaluator.graft(crossover_index_a, parent_b.state_evaluator, crossover_index_b, max_tree_height)
+        child.invalidate_compiled_state_evaluator()
+
+        # Sub-tree mutation
+        mutant = clone(child)
+        mutation_node = mutant.state_evaluator[mutant.state_evaluator.get_rand_live_index()]
+        mutant.state_evaluator.remove_branch(mutation_node.index)
+        mutant.grow(mutation_node, max_tree_height)
+
+    return (time.perf_counter() - start_time) / NUM_CHILDREN
+
+
+if __name__ == '__main__':
+
+    # Process command line arguments
+    args = args_class.Arguments(1, ['config/default.cfg'])
+    config_file = args.get_args()[0]
+
+
+    # Setup configuration
+    config = config_class.Config(config_file)
+    max_tree_height = int(config.settings['max tree height'])
+
+
+    # Create a pool of random parent controllers
+    random.seed(SEED)
+    parents = [pacman_cont_class.PacmanController(config) for _ in range(NUM_PARENTS)]
+
+    for parent in parents:
+        parent.get_compiled_state_evaluator()
+
+
+    for name, clone in [('legacy', legacy_copy), ('copy-on-write', copy.copy)]:
+        clone_time = time_clone(parents, clone)
+        breed_time = time_breed(parents, clone, max_tree_height)
+
+        print('Per-child clone cost (%s): %.1f us' % (name, clone_time * 1e6))
+        print('Per-child crossover and mutation cost (%s): %.1f us' % (name, breed_time * 1e6))
@@ -51,6 +51,15 @@ premature end probability = 0.2\n\
 ramped half-and-half probability = 0.5\n\
 \n\
 ###################################\n\
+# Tree Limits\n\
+###################################\n\
+max tree height = 12\n\
+max tree size = 1000\n\
+tree limit policy = retry\n\
+# One of reject, retry or truncate\n\
+max tree limit retries = 5\n\
+\n\
+###################################\n\
 # World Generation\n\
 ###################################\n\
 width = {width}\n\
@@ -85,6 +94,36 @@ time multiplier = {time multiplier}\n\
 max fp constant = 1000\n\
 \n\
 ###################################\n\
+# Performance\n\
+###################################\n\
+use lockstep evaluation = False\n\
+use maze distance terminals = False\n\
+maze distance cache rows = 128\n\
+use fitness cache = False\n\
+fitness cache size = 1000\n\
+fitness cache samples = 1\n\
+use behavioral fingerprinting = False\n\
+num fingerprint probes = 256\n\
+use state evaluator compilation = True\n\
+use policy tables = False\n\
+policy table size = 4096\n\
+use evaluation pool = False\n\
+num evaluation workers = 0\n\
+evaluation pool transcripts = False\n\
+num parallel runs = 1\n\
+num islands = 1\n\
+migration topology = ring\n\
+num migrants = 2\n\
+migration interval = 5\n\
+use remote evaluation = False\n\
+evaluation worker addresses =\n\
+remote evaluation pipeline depth = 2\n\
+max remote evaluation retries = 3\n\
+remote evaluation timeout = 60\n\
+use steady state = False\n\
+steady state evaluations in flight = 0\n\
+\n\
+###################################\n\
 # Output Files\n\
 ###################################\n\
 log file path = output/{experiment name}_log.txt\n\
@@ -10,4 +10,7 @@ class BaseController:
 
         Returns False otherwise.
         """
+        if game_state.passability_grid:
+            return game_state.passability_grid.is_passable(coord.x, coord.y)
+
         return not coord in game_state.wall_coords and coord.x >= 0 and coord.y >= 0 and coord.x < int(self.config.settings['width']) and coord.y < int(self.config.settings['height'])
@@ -0,0 +1,98 @@
+# Constant declarations
+ARBITRARY_LARGE_NUMBER = 99999
+
+
+class FeatureFrame:
+    def __init__(self, passability_grid, pacman_cells, ghost_cells, fruit_cells, num_adj_walls,
+        pill_distance_field, pill_maze_distance_field=None, ghost_index=None):
+        """Initializes the FeatureFrame class.
+
+        Where passability_grid is the PassabilityGrid of a world, pacman_cells,
+        ghost_cells and fruit_cells are lists of the cells of those units,
+        num_adj_walls is the adjacent wall count seen by the state evaluator
+        and pill_distance_field (and optionally pill_maze_distance_field) are the
+        world's nearest pill DistanceField objects. Maze distance features are
+        only computed if pill_maze_distance_field is given, and are 0 otherwise.
+        If the world's ghost SpatialIndex is given as ghost_index, it is used to
+        find the nearest ghost instead of scanning ghost_cells.
+
+        A FeatureFrame is built once per tick, before any unit moves. It holds
+        the candidate moves of every pacman and the feature matrix (see
+        PacmanController.get_features()) rating them:
+            self.candidates[i] lists the legal (direction, destination cell)
+                pairs of pacman i, in PassabilityGrid.pacman_moves order
+            self.features holds one row per candidate move, pacman by pacman
+        Candidate cells shared by several pacmen are only computed once.
+        """
+        self.passability_grid = passability_grid
+        self.ghost_cells = ghost_cells
+        self.fruit_cells = fruit_cells
+        self.num_adj_walls = num_adj_walls
+        self.pill_distance_field = pill_distance_field
+        self.pill_maze_distance_field = pill_maze_distance_field
+        self.ghost_index = ghost_index
+
+        self.candidates = []
+        self.features = []
+
+        # Feature rows by cell
+        rows = {}
+
+        for pacman_cell in pacman_cells:
+            moves = self.passability_grid.pacman_moves[pacman_cell]
+            self.candidates.append(moves)
+
+            for _, cell in moves:
+                if not cell in rows:
+                    rows[cell] = self.get_row(cell)
+
+                self.features.append(rows[cell])
+
+
+    @classmethod
+    def from_game_state(cls, game_state):
+        """Returns the FeatureFrame of the given GameState.
+
+        The game state must hold its world's PassabilityGrid and nearest pill
+        DistanceField objects (and may hold its ghost SpatialIndex).
+        """
+        grid = game_state.passability_grid
+
+        return cls(grid, [grid.get_cell(c.x, c.y) for c in game_state.pacman_coords], [grid.get_cell(c.x, c.y) for c in game_state.ghost_coords],
+            [grid.get_cell(c.x, c.y) for c in game_state.fruit_coord or []], game_state.num_adj_walls,
+            game_state.pill_distance_field, game_state.pill_maze_distance_field, game_state.ghost_index)
+
+
+    def get_row(self, cell):
+        """Returns the feature row of a pacman at cell."""
+        if self.pill_maze_distance_field:
+            maze_distances = self.passability_grid.maze_distances
+            maze_features = (maze_distances.get_nearest_distance(cell, self.ghost_cells), self.pill_maze_distance_field.get_distance(cell),
+                maze_distances.get_nearest_distance(cell, self.fruit_cells))
+
+        else:
+            maze_features = (0, 0, 0)
+
+        if self.ghost_index:
+            ghost_distance = self.ghost_index.get_nearest_distance(cell)
+
+        else:
+            ghost_distance = self.get_nearest_distance(cell, self.ghost_cells)
+
+        return (ghost_distance, self.pill_distance_field.get_distance(cell),
+            self.get_nearest_distance(cell, self.fruit_cells), self.num_adj_walls) + maze_features
+
+
+    def get_nearest_distance(self, cell, cells_to_search):
+        """Returns the Manhattan distance between cell and the nearest of cells_to_search."""
+        coords = self.passability_grid.coordinate_table.coords
+        coord = coords[cell]
+
+        min_distance = ARBITRARY_LARGE_NUMBER
+        for other_cell in cells_to_search:
+            distance = abs(coord.x - coords[other_cell].x) + abs(coord.y - coords[other_cell].y)
+
+            if distance < min_distance:
+                min_distance = distance
+
+        return min_distance
@@ -0,0 +1,388 @@
+import array
+import controllers.nodes as nodes_classes
+import controllers.tree as tree_class
+import hashlib
+import math
+import random
+
+
+# Assign new node class names
+terminals = nodes_classes.TerminalNodes
+maze_terminals = nodes_classes.MazeTerminalNodes
+functions = nodes_classes.FunctionNodes
+
+
+# Opcode declarations
+# Note: function opcodes come first so that an opcode is a function iff it
+# is less than NUM_FUNCTION_OPCODES. They are followed by the feature terminal
+# opcodes, in feature matrix column order, and finally by FP_CONSTANT
+OPCODES = [functions.ADD, functions.SUBTRACT, functions.MULTIPLY, functions.DIVIDE,
+    functions.RANDOM_FLOAT, terminals.PACMAN_GHOST_DIST, terminals.PACMAN_PILL_DIST,
+    terminals.PACMAN_FRUIT_DIST, terminals.NUM_ADJ_WALLS, maze_terminals.PACMAN_GHOST_MAZE_DIST,
+    maze_terminals.PACMAN_PILL_MAZE_DIST, maze_terminals.PACMAN_FRUIT_MAZE_DIST,
+    terminals.FP_CONSTANT]
+
+OPCODE_INDICES = {value: opcode for opcode, value in enumerate(OPCODES)}
+
+NUM_FUNCTION_OPCODES = len(functions)
+
+ADD          = OPCODE_INDICES[functions.ADD]
+SUBTRACT     = OPCODE_INDICES[functions.SUBTRACT]
+MULTIPLY     = OPCODE_INDICES[functions.MULTIPLY]
+DIVIDE       = OPCODE_INDICES[functions.DIVIDE]
+RANDOM_FLOAT = OPCODE_INDICES[functions.RANDOM_FLOAT]
+GHOST_DIST   = OPCODE_INDICES[terminals.PACMAN_GHOST_DIST]
+PILL_DIST    = OPCODE_INDICES[terminals.PACMAN_PILL_DIST]
+FRUIT_DIST   = OPCODE_INDICES[terminals.PACMAN_FRUIT_DIST]
+ADJ_WALLS    = OPCODE_INDICES[terminals.NUM_ADJ_WALLS]
+FP_CONSTANT  = OPCODE_INDICES[terminals.FP_CONSTANT]
+
+NUM_FEATURES = FP_CONSTANT - GHOST_DIST
+
+SYMBOLS = ['+', '-', '*', '/', 'rand', 'ghost distance', 'pill distance',
+    'fruit distance', 'num adj walls', 'ghost maze distance', 'pill maze distance',
+    'fruit maze distance']
+
+OPCODE_TYPECODE = 'B'
+CONSTANT_TYPECODE = 'd'
+
+GENOTYPE_HASH_SIZE = 16
+
+# Note: every feature value is an integer no larger than this in magnitude
+MAX_FEATURE_VALUE = 99999
+
+# Subtrees whose magnitude is bounded below this can never overflow to an
+# infinite or NaN value
+MAX_FINITE_BOUND = 1e300
+
+
+def apply_function(opcode, left, right):
+    """Evaluates the function opcode on the given operands, producing a FP value.
+
+    The semantics match the recursive state evaluator: DIVIDE produces 0.0 if
+    either operand is 0.0, and RANDOM_FLOAT draws between the smaller and the
+    larger operand.
+    """
+    if opcode == ADD:
+        return left + right
+
+    if opcode == SUBTRACT:
+        return left - right
+
+    if opcode == MULTIPLY:
+        return left * right
+
+    if opcode == DIVIDE:
+        if left == 0.0 or right == 0.0:
+            return 0.0
+
+        return left / right
+
+    return random.uniform(min(left, right), max(left, right))
+
+
+class SimplifiedSubtree:
+    def __init__(self, opcodes, constants, bound, min_nonzero_magnitude, uses_random):
+        """Initializes the SimplifiedSubtree class.
+
+        A SimplifiedSubtree holds the prefix arrays of a simplified subtree along
+        with what is known about its value on any feature matrix row:
+            bound is an upper bound on the magnitude of its value (infinite if
+                the value may be infinite or NaN)
+            min_nonzero_magnitude is a lower bound on the magnitude of its
+                value whenever that value is not 0.0 (0.0 if unknown)
+            uses_random is True if it contains a RANDOM_FLOAT node
+        """
+        self.opcodes = opcodes
+        self.constants = constants
+        self.bound = bound
+        self.min_nonzero_magnitude = min_nonzero_magnitude
+        self.uses_random = uses_random
+
+
+    def is_constant(self, value=None):
+        """Returns True if this subtree is a FP constant (equal to value, if given)."""
+        if len(self.opcodes) != 1 or self.opcodes[0] != FP_CONSTANT:
+            return False
+
+        return value is None or self.constants[0] == value
+
+
+    def is_finite(self):
+        """Returns True if the value of this subtree is always finite."""
+        return self.bound < MAX_FINITE_BOUND
+
+
+    def is_removable(self):
+        """Returns True if this subtree can be dropped without changing the
+        values (or the random numbers) produced by the rest of the tree.
+        """
+        return not self.uses_random
+
+
+def get_constant_subtree(value):
+    """Returns the SimplifiedSubtree of a FP constant."""
+    magnitude = abs(value) if math.isfinite(value) else math.inf
+
+    return SimplifiedSubtree([FP_CONSTANT], [value], magnitude, magnitude, False)
+
+
+def simplify_function(opcode, left, right):
+    """Returns the SimplifiedSubtree of the function opcode applied to the
+    given SimplifiedSubtree operands.
+
+    Only rewrites that produce exactly the same value (see apply_function()),
+    and consume the same random numbers, on every feature matrix row are applied.
+    Note: -0.0 and 0.0 are interchangeable, as they compare equal and DIVIDE
+    treats both as zero.
+    """
+    if opcode != RANDOM_FLOAT and left.is_constant() and right.is_constant():
+        # Fold the constant subtree
+        return get_constant_subtree(apply_function(opcode, left.constants[0], right.constants[0]))
+
+    if opcode == ADD:
+        if left.is_constant(0.0):
+            return right
+
+        if right.is_constant(0.0):
+            return left
+
+    elif opcode == SUBTRACT:
+        if right.is_constant(0.0):
+            return left
+
+        if left.opcodes == right.opcodes and left.constants == right.constants and left.is_removable() and left.is_finite():
+            # x - x
+            return get_constant_subtree(0.0)
+
+    elif opcode == MULTIPLY:
+        if left.is_constant(1.0):
+            return right
+
+        if right.is_constant(1.0):
+            return left
+
+        if (left.is_constant(0.0) and right.is_removable() and right.is_finite()) or (right.is_constant(0.0) and left.is_removable() and left.is_finite()):
+            # x * 0 (as x is finite)
+            return get_constant_subtree(0.0)
+
+    elif opcode == DIVIDE:
+        if (left.is_constant(0.0) and right.is_removable()) or (right.is_constant(0.0) and left.is_removable()):
+            # DIVIDE produces 0.0 if either operand is 0.0, whatever the other one is
+            return get_constant_subtree(0.0)
+
+        if right.is_constant(1.0):
+            return left
+
+    opcodes = [opcode] + left.opcodes + right.opcodes
+    constants = [0.0] + left.constants + right.constants
+    uses_random = left.uses_random or right.uses_random or opcode == RANDOM_FLOAT
+
+    if not left.is_finite() or not right.is_finite():
+        bound = math.inf
+
+    elif opcode == ADD or opcode == SUBTRACT:
+        bound = left.bound + right.bound
+
+    elif opcode == MULTIPLY:
+        bound = left.bound * right.bound
+
+    elif opcode == DIVIDE:
+        bound = left.bound / right.min_nonzero_magnitude if right.min_nonzero_magnitude else math.inf
+
+    else:
+        bound = max(left.bound, right.bound)
+
+    return SimplifiedSubtree(opcodes, constants, bound, 0.0, uses_random)
+
+
+class FlatTree:
+    def __init__(self, config, opcodes=None, constants=None):
+        """Initializes the FlatTree class.
+
+        A FlatTree is a compact form of a state evaluator, derived from its
+        (heap indexed) Tree, which remains the genome evolved by the GP. Nodes are
+        stored in prefix order in two contiguous, equally long arrays: one of
+        opcodes (see OPCODES) and one of FP constants (only meaningful where the
+        opcode is FP_CONSTANT), so memory use is proportional to the number of
+        nodes. FlatTrees are used to simplify, compile, interpret, hash and ship
+        (to evaluation workers or other islands) state evaluators.
+        """
+        self.config = config
+
+        self.opcodes = array.array(OPCODE_TYPECODE, opcodes if opcodes else [])
+        self.constants = array.array(CONSTANT_TYPECODE, constants if constants else [])
+
+
+    @classmethod
+    def from_tree(cls, config, tree):
+        """Returns a FlatTree equivalent to the given (heap indexed) Tree."""
+        flat_tree = cls(config)
+        node_stack = [tree.get_root()]
+
+        while node_stack:
+            node = node_stack.pop()
+
+            if tree.is_leaf(node):
+                if node.value in OPCODE_INDICES:
+                    flat_tree.append_node(OPCODE_INDICES[node.value])
+
+                else:
+                    flat_tree.append_node(FP_CONSTANT, float(node.value))
+
+            else:
+                flat_tree.append_node(OPCODE_INDICES[node.value])
+
+                # Push the right child first so the left child is visited first
+                node_stack.append(tree.get_right_child(node))
+                node_stack.append(tree.get_left_child(node))
+
+        return flat_tree
+
+
+    def to_tree(self):
+        """Returns a (heap indexed) Tree equivalent to this FlatTree."""
+        tree = tree_class.Tree(self.config, self.get_value(0))
+
+        # Heap indices of the nodes whose children are still to be placed
+        parent_stack = [0] if self.opcodes[0] < NUM_FUNCTION_OPCODES else []
+
+        for index in range(1, len(self.opcodes)):
+            parent_index = parent_stack[-1]
+
+            if 2 * parent_index + 1 >= len(tree) or tree[2 * parent_index + 1].value is None:
+                heap_index = 2 * parent_index + 1
+
+            else:
+                heap_index = 2 * parent_index + 2
+                parent_stack.pop()
+
+            tree.add_node_at_index(heap_index, self.get_value(index))
+
+            if self.opcodes[index] < NUM_FUNCTION_OPCODES:
+                parent_stack.append(heap_index)
+
+        return tree
+
+
+    def __len__(self):
+        return len(self.opcodes)
+
+
+    def __str__(self):
+        return str([self.get_value(index) for index in range(len(self.opcodes))])
+
+
+    def __copy__(self):
+        """Performs a deep copy of this object."""
+        return type(self)(self.config, self.opcodes, self.constants)
+
+
+    def append_node(self, opcode, constant=0.0):
+        """Appends a node to the end of the prefix arrays."""
+        self.opcodes.append(opcode)
+        self.constants.append(constant)
+
+
+    def get_value(self, index):
+        """Returns the node value (as stored in a Tree) of the node at index."""
+        if self.opcodes[index] == FP_CONSTANT:
+            return self.constants[index]
+
+        return OPCODES[self.opcodes[index]]
+
+
+    def get_num_nodes(self):
+        """Returns the number of nodes in this tree."""
+        return len(self.opcodes)
+
+
+    def get_genotype_hash(self):
+        """Returns a canonical structural hash (bytes) of this tree.
+
+        Trees with the same nodes in the same positions have the same hash,
+        regardless of how their Tree form is laid out in memory.
+        """
+        return hashlib.blake2b(self.opcodes.tobytes() + self.constants.tobytes(), digest_size=GENOTYPE_HASH_SIZE).digest()
+
+
+    def fold(self, get_leaf_result, get_function_result):
+        """Reduces this tree bottom-up to a single result without recursion.
+
+        get_leaf_result(index) produces the result of the leaf at index, and
+        get_function_result(index, left_result, right_result) combines the
+        results of the children of the function node at index. The left subtree
+        is always reduced before the right subtree.
+        """
+        # Each frame holds a function node index followed by its reduced operands
+        frame_stack = []
+
+        for index in range(len(self.opcodes)):
+            if self.opcodes[index] < NUM_FUNCTION_OPCODES:
+                frame_stack.append([index])
+                continue
+
+            result = get_leaf_result(index)
+
+            while frame_stack:
+                frame = frame_stack[-1]
+                frame.append(result)
+
+                if len(frame) < 3:
+                    break
+
+                frame_stack.pop()
+                result = get_function_result(frame[0], frame[1], frame[2])
+
+            else:
+                return result
+
+
+    def simplify(self):
+        """Returns a new FlatTree which evaluates to exactly the same value as this
+        one (consuming the same random numbers) on every feature matrix row, with
+        its constant subtrees folded and the identities of simplify_function() applied.
+
+        The simplified tree is only meant for evaluation; this tree (the genotype)
+        is left unchanged.
+        """
+
+        def get_leaf_result(index):
+            if self.opcodes[index] == FP_CONSTANT:
+                return get_constant_subtree(self.constants[index])
+
+            return SimplifiedSubtree([self.opcodes[index]], [0.0], MAX_FEATURE_VALUE, 1.0, False)
+
+
+        simplified_tree = self.fold(get_leaf_result, lambda index, left, right : simplify_function(self.opcodes[index], left, right))
+
+        return type(self)(self.config, simplified_tree.opcodes, simplified_tree.constants)
+
+
+    def get_height(self):
+        """Returns the maximum depth (height) of this tree."""
+        return self.fold(lambda index : 1, lambda index, left, right : 1 + max(left, right))
+
+
+    def visualize(self, print_output=True):
+        """Prints a function representing this tree.
+
+        If print_output is True, the output is printed. Otherwise, it
+        is returned as a string.
+        """
+
+        def get_symbol(index):
+            """Returns a symbol (string) associated with the node at index."""
+            if self.opcodes[index] == FP_CONSTANT:
+                return str(self.constants[index])
+
+            return SYMBOLS[self.opcodes[index]]
+
+
+        output = self.fold(get_symbol, lambda index, left, right : '( ' + left + ' ' + get_symbol(index) + ' ' + right + ' )')
+
+        if print_output:
+            print(output)
+
+        else:
+            return output
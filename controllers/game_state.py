@@ -4,6 +4,10 @@ class GameState:
         self.update(pacman_coords, ghost_coords, pill_coords, num_adj_walls)
 
         self.wall_coords = None
+        self.passability_grid = None
+        self.pill_distance_field = None
+        self.pill_maze_distance_field = None
+        self.ghost_index = None
         self.fruit_coord = None
 
 
@@ -15,8 +19,33 @@ class GameState:
         self.num_adj_walls = num_adj_walls
         self.fruit_coord = fruit_coord
 
+        # The features of the previous tick no longer apply
+        self.feature_frame = None
 
-    def update_walls(self, wall_coords):
-        """Updates the wall coordinates."""
+
+    def update_walls(self, wall_coords, passability_grid=None):
+        """Updates the wall coordinates and (optionally) the world's PassabilityGrid."""
         self.wall_coords = wall_coords
-        
\ No newline at end of file
+        self.passability_grid = passability_grid
+        
+
+    def update_distance_fields(self, pill_distance_field, pill_maze_distance_field=None):
+        """Updates the world's nearest pill DistanceField objects.
+
+        Note: the fields are updated in place by the world as pills are eaten.
+        """
+        self.pill_distance_field = pill_distance_field
+        self.pill_maze_distance_field = pill_maze_distance_field
+
+
+    def update_ghost_index(self, ghost_index):
+        """Updates the world's ghost SpatialIndex.
+
+        Note: the index is updated in place by the world as ghosts move.
+        """
+        self.ghost_index = ghost_index
+
+
+    def update_feature_frame(self, feature_frame):
+        """Updates the FeatureFrame gathered for the current tick."""
+        self.feature_frame = feature_frame
@@ -21,6 +21,17 @@ class GhostsController(base_controller_class.BaseController):
 
         Note: for assignment 2b, the move is randomized.
         """
+        if game_state.passability_grid:
+            # Sample directly from the legal moves of the ghost's cell
+            ghost_coord = game_state.ghost_coords[ghost_id]
+            legal_moves = game_state.passability_grid.ghost_moves[game_state.passability_grid.get_cell(ghost_coord.x, ghost_coord.y)]
+
+            if not legal_moves:
+                # The ghost is boxed in
+                return d.Direction.NONE
+
+            return random.choice(legal_moves)[0]
+
         while True:
             # Choose a random direction
             direction_to_try = random.choice(self.POSSIBLE_MOVES)
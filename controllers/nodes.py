@@ -9,6 +9,13 @@ class TerminalNodes(Enum):
     FP_CONSTANT       = 4
 
 
+# Optional terminals, enabled by the 'use maze distance terminals' setting
+class MazeTerminalNodes(Enum):
+    PACMAN_GHOST_MAZE_DIST = 0
+    PACMAN_PILL_MAZE_DIST  = 1
+    PACMAN_FRUIT_MAZE_DIST = 2
+
+
 class FunctionNodes(Enum):
     ADD               = 0
     SUBTRACT          = 1
@@ -1,7 +1,11 @@
 import controllers.base_controller as base_controller_class
 import controllers.direction as d
+import controllers.flat_tree as flat_tree_class
 import controllers.nodes as nodes_classes
+import controllers.policy_table as policy_table_class
+import controllers.stack_interpreter as stack_interpreter_class
 import controllers.tree as tree_class
+import controllers.tree_compiler as tree_compiler_class
 import copy
 import random
 import world.coordinate as coord_class
@@ -9,6 +13,7 @@ import world.coordinate as coord_class
 
 # Assign new node class names
 terminals = nodes_classes.TerminalNodes
+maze_terminals = nodes_classes.MazeTerminalNodes
 functions = nodes_classes.FunctionNodes
 
 
@@ -19,16 +24,125 @@ POSSIBLE_MOVES = [d.Direction.NONE, d.Direction.UP, d.Direction.DOWN,
 ARBITRARY_LARGE_NUMBER = 99999
 
 
+# Shared state evaluator compiler
+tree_compiler = tree_compiler_class.TreeCompiler()
+
+
 class PacmanController(base_controller_class.BaseController):
-    def __init__(self, config):
-        """Initializes the PacmanController class."""
+    def __init__(self, config, state_evaluator=None):
+        """Initializes the PacmanController class.
+
+        If no state_evaluator (Tree) is given, a random one is initialized.
+        """
         self.config = config
 
         super(base_controller_class.BaseController, self).__init__()
 
         self.max_fp_constant = float(self.config.settings['max fp constant'])
+        self.use_maze_distance_terminals = self.config.settings.getboolean('use maze distance terminals')
+        self.use_state_evaluator_compilation = self.config.settings.getboolean('use state evaluator compilation')
+        self.use_policy_tables = self.config.settings.getboolean('use policy tables')
+
+        if state_evaluator:
+            self.state_evaluator = state_evaluator
+            self.invalidate_compiled_state_evaluator()
+
+        else:
+            self.init_state_evaluator()
+
+
+    def get_compiled_state_evaluator(self):
+        """Returns the compiled (batch) form of self.state_evaluator, compiling it 
+        if it has not been compiled since it was last modified.
+
+        The compiled form takes a feature matrix (see get_features()) and returns
+        one evaluation per row. It is compiled from the simplified state evaluator
+        (see get_simplified_state_evaluator()).
+        """
+        if not self.compiled_state_evaluator:
+            self.compiled_state_evaluator = tree_compiler.compile_batch(self.get_simplified_state_evaluator())
+
+        return self.compiled_state_evaluator
+
+
+    def get_interpreted_state_evaluator(self):
+        """Returns the StackInterpreter of the simplified state evaluator (see
+        get_simplified_state_evaluator()), creating it if it has not been created
+        since self.state_evaluator was last modified.
+
+        The interpreter behaves exactly as the compiled form, without generating
+        any code.
+        """
+        if not self.interpreted_state_evaluator:
+            self.interpreted_state_evaluator = stack_interpreter_class.StackInterpreter(self.get_simplified_state_evaluator())
+
+        return self.interpreted_state_evaluator
+
+
+    def get_policy_table(self):
+        """Returns the PolicyTable memoizing the ratings of self.state_evaluator,
+        creating it if it has not been created since it was last modified.
+
+        Returns False if the simplified state evaluator uses RANDOM_FLOAT, as its
+        ratings cannot be memoized.
+        """
+        if self.policy_table is None:
+            if flat_tree_class.RANDOM_FLOAT in self.get_simplified_state_evaluator().opcodes:
+                self.policy_table = False
+
+            else:
+                self.policy_table = policy_table_class.PolicyTable(int(self.config.settings['policy table size']))
+
+        return self.policy_table
+
+
+    def get_flat_state_evaluator(self):
+        """Returns self.state_evaluator as a FlatTree, converting it if it has 
+        not been converted since it was last modified.
+        """
+        if not self.flat_state_evaluator:
+            self.flat_state_evaluator = flat_tree_class.FlatTree.from_tree(self.config, self.state_evaluator)
+
+        return self.flat_state_evaluator
+
+
+    def get_simplified_state_evaluator(self):
+        """Returns the simplified FlatTree form of self.state_evaluator (see
+        FlatTree.simplify()), simplifying it if it has not been simplified since
+        it was last modified.
+
+        The simplified form is only used for evaluation, so evolution still
+        operates on the unsimplified tree.
+        """
+        if not self.simplified_state_evaluator:
+            self.simplified_state_evaluator = self.get_flat_state_evaluator().simplify()
+
+        return self.simplified_state_evaluator
 
-        self.init_state_evaluator()
+
+    def get_genotype_hash(self):
+        """Returns the canonical structural hash of self.state_evaluator (see
+        FlatTree.get_genotype_hash()), computing it if it has not been computed
+        since it was last modified.
+        """
+        if not self.genotype_hash:
+            self.genotype_hash = self.get_flat_state_evaluator().get_genotype_hash()
+
+        return self.genotype_hash
+
+
+    def invalidate_compiled_state_evaluator(self):
+        """Discards the compiled, interpreted, flat and simplified forms (and the
+        genotype hash and policy table) of self.state_evaluator.
+
+        This must be called whenever self.state_evaluator is modified.
+        """
+        self.compiled_state_evaluator = None
+        self.interpreted_state_evaluator = None
+        self.policy_table = None
+        self.flat_state_evaluator = None
+        self.simplified_state_evaluator = None
+        self.genotype_hash = None
 
 
     def init_state_evaluator(self):
@@ -62,6 +176,7 @@ class PacmanController(base_controller_class.BaseController):
 
         target_height = random.randint(2, int(self.config.settings['max tree generation height']))
         self.state_evaluator = tree_class.Tree(self.config, self.get_rand_function_node())
+        self.invalidate_compiled_state_evaluator()
 
         if random.random() < float(self.config.settings['ramped half-and-half probability']):
             # Use full initialization method
@@ -76,7 +191,12 @@ class PacmanController(base_controller_class.BaseController):
 
     def get_rand_terminal_node(self):
         """Returns a random terminal node."""
-        terminal_node = random.choices([node for node in terminals])[0]
+        terminal_nodes = [node for node in terminals]
+
+        if self.use_maze_distance_terminals:
+            terminal_nodes += [node for node in maze_terminals]
+
+        terminal_node = random.choices(terminal_nodes)[0]
 
         if terminal_node == terminals.FP_CONSTANT:
             # Return a floating point constant
@@ -125,22 +245,56 @@ class PacmanController(base_controller_class.BaseController):
             return False
 
 
+        # Gather the features of every valid candidate move of every pacman so
+        # the state evaluator can rate all of them in a single pass
+        if game_state.feature_frame:
+            # The features were gathered once for this tick (see FeatureFrame)
+            candidate_directions = [[direction for direction, _ in moves] for moves in game_state.feature_frame.candidates]
+            features = game_state.feature_frame.features
+
+        else:
+            candidate_coords = []
+            candidate_directions = []
+
+            for pacman_coord in game_state.pacman_coords:
+                directions = []
+
+                if game_state.passability_grid:
+                    # Only consider the legal moves of pacman's cell
+                    grid = game_state.passability_grid
+
+                    for direction, cell in grid.pacman_moves[grid.get_cell(pacman_coord.x, pacman_coord.y)]:
+                        candidate_coords.append(grid.coordinate_table.coords[cell])
+                        directions.append(direction)
+
+                else:
+                    for direction in POSSIBLE_MOVES:
+                        tmp_pacman_coord = coord_class.Coordinate(pacman_coord.x, pacman_coord.y)
+
+                        if move_pacman(tmp_pacman_coord, direction):
+                            candidate_coords.append(tmp_pacman_coord)
+                            directions.append(direction)
+
+                candidate_directions.append(directions)
+
+            features = self.get_features(game_state, candidate_coords)
+
+        eval_results = self.evaluate_states(features)
+
         best_eval_directions = []
+        eval_index = 0
 
-        for pacman_coord in game_state.pacman_coords:
+        for directions in candidate_directions:
             best_eval_result = -1 * ARBITRARY_LARGE_NUMBER
             best_eval_direction = d.Direction.NONE
 
-            for direction in POSSIBLE_MOVES:
-                tmp_pacman_coord = coord_class.Coordinate(pacman_coord.x, pacman_coord.y)
+            for direction in directions:
+                if eval_results[eval_index] > best_eval_result:
+                    best_eval_result = eval_results[eval_index]
+                    best_eval_direction = direction
 
-                if move_pacman(tmp_pacman_coord, direction):
-                    eval_result = self.evaluate_state(game_state, tmp_pacman_coord)[0]
+                eval_index += 1
 
-                    if eval_result > best_eval_result:
-                        best_eval_result = eval_result
-                        best_eval_direction = direction
-            
             best_eval_directions.append(best_eval_direction)
 
         return best_eval_directions
@@ -153,6 +307,48 @@ class PacmanController(base_controller_class.BaseController):
         Optional parameter pacman_coord can check a differing pacman
         coordinate against the state evaluator.
         """
+        if not pacman_coord:
+            pacman_coords = game_state.pacman_coords
+
+        else:
+            pacman_coords = [pacman_coord]
+
+        return self.evaluate_states(self.get_features(game_state, pacman_coords))
+
+
+    def evaluate_states(self, features):
+        """Rates every row of the feature matrix features (see get_features()) 
+        with the state evaluator in a single pass, returning a list of ratings.
+
+        If policy tables are enabled and the state evaluator is deterministic,
+        rows already rated are looked up in its PolicyTable instead.
+        """
+        if self.use_policy_tables and self.get_policy_table():
+            return self.policy_table.evaluate(features, self.get_state_evaluator_function())
+
+        return self.get_state_evaluator_function()(features)
+
+
+    def get_state_evaluator_function(self):
+        """Returns the batch function rating a feature matrix with the state
+        evaluator: the compiled state evaluator, unless state evaluator
+        compilation is disabled, in which case the interpreted one.
+        """
+        if self.use_state_evaluator_compilation:
+            return self.get_compiled_state_evaluator()
+
+        return self.get_interpreted_state_evaluator()
+
+
+    def get_features(self, game_state, pacman_coords):
+        """Returns a feature matrix holding one row per coordinate in pacman_coords.
+
+        Each row holds the state evaluator's terminal values for a pacman at that
+        coordinate: (ghost distance, pill distance, fruit distance, num adj walls,
+        ghost maze distance, pill maze distance, fruit maze distance). The maze
+        distances are only computed if maze distance terminals are enabled, and
+        are 0 otherwise.
+        """
 
         def get_nearest_distance(pacman_coord, object):
             """Returns the distance between the given pacman coordinate
@@ -171,6 +367,10 @@ class PacmanController(base_controller_class.BaseController):
                 coords_to_search = game_state.ghost_coords
             
             elif object == 'pill':
+                if game_state.pill_distance_field:
+                    # Note: the field holds the Manhattan distance to the nearest pill
+                    return game_state.pill_distance_field.get_distance(game_state.passability_grid.get_cell(pacman_coord.x, pacman_coord.y))
+
                 coords_to_search = game_state.pill_coords
 
             elif object == 'fruit' and game_state.fruit_coord:
@@ -185,93 +385,36 @@ class PacmanController(base_controller_class.BaseController):
             
             return min_distance
 
-        
-        def evaluate_state_recursive(node):
-
-            def is_last_function_node(node):
-                """Returns True if this node's children are terminal nodes,
-                False otherwise.
-                """
-                if not self.state_evaluator.is_leaf(node):
-                    return False
-                
-                return self.state_evaluator.get_left_child().value in [n for n in terminals]
-        
-
-            def get_fp(node):
-                """Returns the FP value associated with the given *terminal* node."""
-                nonlocal ghost_distance
-                nonlocal pill_distance
-                nonlocal fruit_distance
-                nonlocal num_adj_walls
-
-                ret = 0
-
-                if node.value == terminals.PACMAN_GHOST_DIST:
-                    ret = ghost_distance
-                
-                elif node.value == terminals.PACMAN_PILL_DIST:
-                    ret = pill_distance
-
-                elif node.value == terminals.PACMAN_FRUIT_DIST:
-                    ret = fruit_distance
 
-                elif node.value == terminals.NUM_ADJ_WALLS:
-                    ret = num_adj_walls
-                
-                else:
-                    ret = node.value
-                
-                return float(ret)
-
-
-            def evaluate(operator, operands):
-                """Evaluates the given operator and operands, producing a FP value."""
-                if operator == functions.RANDOM_FLOAT:
-                    return random.uniform(min(operands), max(operands))
+        def get_maze_distances(pacman_coord):
+            """Returns the maze distances between the given pacman coordinate and 
+            the nearest ghost, pill and fruit.
+            """
+            if not self.use_maze_distance_terminals:
+                return (0, 0, 0)
 
-                if operator == functions.MULTIPLY:
-                    return operands[0] * operands[1]
-                
-                if operator == functions.DIVIDE:
-                    if 0.0 in operands:
-                        return 0.0
-                    
-                    else:
-                        return operands[0] / operands[1]
-                
-                if operator == functions.ADD:
-                    return operands[0] + operands[1]
-                
-                if operator == functions.SUBTRACT:
-                    return operands[0] - operands[1]
+            grid = game_state.passability_grid
+            cell = grid.get_cell(pacman_coord.x, pacman_coord.y)
 
+            def get_nearest_maze_distance(coords):
+                return grid.maze_distances.get_nearest_distance(cell, [grid.get_cell(c.x, c.y) for c in coords])
 
-            if self.state_evaluator.is_leaf(node):
-                return get_fp(node)
 
-            if is_last_function_node(node):
-                return evaluate(node.value, [node.left(), node.right()])
-            
-            return evaluate(node.value, [evaluate_state_recursive(self.state_evaluator.get_left_child(node)), evaluate_state_recursive(self.state_evaluator.get_right_child(node))])
+            if game_state.pill_maze_distance_field:
+                pill_maze_distance = game_state.pill_maze_distance_field.get_distance(cell)
 
+            else:
+                pill_maze_distance = get_nearest_maze_distance(game_state.pill_coords)
 
-        if not pacman_coord:
-            pacman_coords = game_state.pacman_coords
+            return (get_nearest_maze_distance(game_state.ghost_coords), pill_maze_distance, get_nearest_maze_distance(game_state.fruit_coord or []))
 
-        else:
-            pacman_coords = [pacman_coord]
 
-        evaluations = []
+        features = []
         for pacman_coord in pacman_coords:
-            ghost_distance = get_nearest_distance(pacman_coord, 'ghost')
-            pill_distance = get_nearest_distance(pacman_coord, 'pill')
-            fruit_distance = get_nearest_distance(pacman_coord, 'fruit')
-            num_adj_walls = game_state.num_adj_walls
+            features.append((get_nearest_distance(pacman_coord, 'ghost'), get_nearest_distance(pacman_coord, 'pill'),
+                get_nearest_distance(pacman_coord, 'fruit'), game_state.num_adj_walls) + get_maze_distances(pacman_coord))
 
-            evaluations.append(evaluate_state_recursive(self.state_evaluator.get_root()))
-        
-        return evaluations
+        return features
 
 
     def visualize(self, print_output=True):
@@ -280,91 +423,113 @@ class PacmanController(base_controller_class.BaseController):
         If print_output is True, the output is printed. Otherwise, it 
         is returned as a string.
         """
+        return self.get_flat_state_evaluator().visualize(print_output)
 
-        def get_symbol(node):
-            """Returns a symbol (string) associated with the given node."""
-            if node.value == terminals.PACMAN_GHOST_DIST:
-                return 'ghost distance'
 
-            if node.value == terminals.PACMAN_PILL_DIST:
-                return 'pill distance'
+    def __copy__(self):
+        """Performs a deep copy of this object.
 
-            if node.value == terminals.PACMAN_FRUIT_DIST:
-                return 'fruit distance'
+        Note: no random state evaluator is initialized for the copy, and the copied
+        state evaluator shares its nodes with this one until either is modified.
+        """
+        other = type(self).__new__(type(self))
+        super(base_controller_class.BaseController, other).__init__()
+        other.config = self.config
+        other.max_fp_constant = self.max_fp_constant
+        other.use_maze_distance_terminals = self.use_maze_distance_terminals
+        other.use_state_evaluator_compilation = self.use_state_evaluator_compilation
+        other.use_policy_tables = self.use_policy_tables
+        other.state_evaluator = copy.copy(self.state_evaluator)
+
+        # The copied state evaluator is identical, so its compiled, interpreted, flat and simplified forms
+        # (and its policy table) can be shared
+        other.compiled_state_evaluator = self.compiled_state_evaluator
+        other.interpreted_state_evaluator = self.interpreted_state_evaluator
+        other.policy_table = self.policy_table
+        other.flat_state_evaluator = self.flat_state_evaluator
+        other.simplified_state_evaluator = self.simplified_state_evaluator
+        other.genotype_hash = self.genotype_hash
 
-            if node.value == terminals.NUM_ADJ_WALLS:
-                return 'num adj walls'
-            
-            if node.value == functions.ADD:
-                return '+'
-                
-            if node.value == functions.SUBTRACT:
-                return '-'
-                
-            if node.value == functions.MULTIPLY:
-                return '*'
-                
-            if node.value == functions.DIVIDE:
-                return '/'
-                
-            if node.value == functions.RANDOM_FLOAT:
-                return 'rand'
+        return other
+
+
+    def grow(self, starting_node, max_height=None):
+        """Randomly (re)grows a branch on state_evaluator starting at (and including) 
+        starting_node up to target_height.
 
-            return str(node.value)
+        If max_height is given, the branch stops growing at that depth of the
+        tree. Returns True if this cut the branch short, False otherwise.
+        """
 
+        def grow_branch(starting_node):
+            # Note: nodes are grown depth first, left before right, so random
+            # numbers are drawn in the same order as by a recursive traversal
+            node_stack = [(starting_node, 1)]
 
-        def visualize_recursive(node):
-            if self.state_evaluator.is_leaf(node):
-                return get_symbol(node)
+            while node_stack:
+                node, relative_depth = node_stack.pop()
 
-            return '( ' + visualize_recursive(self.state_evaluator.get_left_child(node)) + ' ' + get_symbol(node) + ' ' + visualize_recursive(self.state_evaluator.get_right_child(node)) + ' )'
+                if relative_depth == target_height:
+                    self.state_evaluator.add_node_left(node, self.get_rand_terminal_node())
+                    self.state_evaluator.add_node_right(node, self.get_rand_terminal_node())
+                    continue
 
+                self.state_evaluator.add_node_left(node, self.get_rand_function_node())
+                self.state_evaluator.add_node_right(node, self.get_rand_function_node())
 
-        output = visualize_recursive(self.state_evaluator.get_root())
+                node_stack.append((self.state_evaluator.get_right_child(node), relative_depth + 1))
+                node_stack.append((self.state_evaluator.get_left_child(node), relative_depth + 1))
+
+
+        target_height = random.randint(int(self.config.settings['min tree mutation height']), int(self.config.settings['max tree mutation height']))
+
+        # Note: the leaves of the branch lie target_height levels below starting_node
+        starting_depth = self.state_evaluator.get_depth(starting_node.index)
+        is_truncated = False
+
+        if max_height and starting_depth + target_height > max_height:
+            target_height = max_height - starting_depth
+            is_truncated = True
+
+        if target_height < 1:
+            self.state_evaluator.set_value(starting_node.index, self.get_rand_terminal_node())
 
-        if print_output:
-            print(output)
-        
         else:
-            return output
+            self.state_evaluator.set_value(starting_node.index, self.get_rand_function_node())
+            grow_branch(starting_node)
 
+        self.invalidate_compiled_state_evaluator()
 
-    def __copy__(self):
-        """Performs a deep copy of this object, except for the state evaluator."""
-        other = type(self)(self.config)
-        super(base_controller_class.BaseController, other).__init__()
-        other.config = self.config
-        other.max_fp_constant = float(self.config.settings['max fp constant'])
-        other.state_evaluator = tree_class.Tree(self.config)
-        other.state_evaluator.list[:] = [tree_class.TreeNode(node.index, node.value) if node else None for node in self.state_evaluator]
+        return is_truncated
 
-        return other
 
+    def truncate(self, max_height, max_size):
+        """Cuts state_evaluator down to at most max_height levels and max_size nodes.
 
-    def grow(self, starting_node):
-        """Randomly (re)grows a branch on state_evaluator starting at (and including) 
-        starting_node up to target_height.
+        Nodes deeper than the cut are removed and function nodes left at its
+        depth are replaced by random terminal nodes. While the tree still has more
+        than max_size nodes, it is cut one level higher.
         """
+        height = min(max_height, self.state_evaluator.get_height())
 
-        def grow_recursive(node, relative_depth=1):
-            if relative_depth == target_height:
-                self.state_evaluator.add_node_left(node, self.get_rand_terminal_node())
-                self.state_evaluator.add_node_right(node, self.get_rand_terminal_node())
-                return
+        while True:
+            for index in self.state_evaluator.live_indices[:]:
+                depth = self.state_evaluator.get_depth(index)
 
-            self.state_evaluator.add_node_left(node, self.get_rand_function_node())
-            self.state_evaluator.add_node_right(node, self.get_rand_function_node())
+                if depth > height:
+                    self.state_evaluator.set_value(index, None)
 
-            grow_recursive(self.state_evaluator.get_left_child(node), relative_depth + 1)
-            grow_recursive(self.state_evaluator.get_right_child(node), relative_depth + 1)
+                elif depth == height and isinstance(self.state_evaluator[index].value, functions):
+                    self.state_evaluator.set_value(index, self.get_rand_terminal_node())
 
-        
-        target_height = random.randint(int(self.config.settings['min tree mutation height']), int(self.config.settings['max tree mutation height']))
+            if self.get_num_nodes() <= max_size or height == 1:
+                break
+
+            height -= 1
 
-        self.state_evaluator[starting_node.index].value = self.get_rand_function_node()
-        grow_recursive(starting_node)
+        self.invalidate_compiled_state_evaluator()
 
 
     def get_num_nodes(self):
         """Returns the number of non-None nodes in self.state_evaluator."""
-        return len([node for node in self.state_evaluator if node.value])
+        return self.state_evaluator.get_num_nodes()
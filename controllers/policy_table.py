@@ -0,0 +1,60 @@
+import sys
+
+
+class PolicyTable:
+    def __init__(self, max_size):
+        """Initializes the PolicyTable class.
+
+        A PolicyTable memoizes the ratings a deterministic state evaluator (one
+        without RANDOM_FLOAT nodes) gives to feature matrix rows (see
+        PacmanController.get_features()). As the rating of such an evaluator only
+        depends on the row, rows met again (within a game or across games) are
+        looked up rather than evaluated.
+
+        At most max_size rows are stored; once the table is full, new rows are
+        still evaluated but no longer stored.
+        """
+        self.max_size = max_size
+        self.entries = {}
+
+        self.num_lookups = 0
+        self.num_hits = 0
+
+
+    def evaluate(self, features, state_evaluator):
+        """Returns the rating of every row of the feature matrix features.
+
+        Rows missing from the table are rated in a single call to the batch
+        state evaluator function state_evaluator, then stored.
+        """
+        evaluations = [self.entries.get(row) for row in features]
+        missing_rows = [row for row, evaluation in zip(features, evaluations) if evaluation is None]
+
+        self.num_lookups += len(evaluations)
+        self.num_hits += len(evaluations) - len(missing_rows)
+
+        if not missing_rows:
+            return evaluations
+
+        missing_evaluations = state_evaluator(missing_rows)
+
+        for row, evaluation in zip(missing_rows, missing_evaluations):
+            if len(self.entries) >= self.max_size:
+                break
+
+            self.entries[row] = evaluation
+
+        missing_evaluations = iter(missing_evaluations)
+
+        return [next(missing_evaluations) if evaluation is None else evaluation for evaluation in evaluations]
+
+
+    def reset_counters(self):
+        """Resets the lookup and hit counters of this table."""
+        self.num_lookups = 0
+        self.num_hits = 0
+
+
+    def get_memory_size(self):
+        """Returns the approximate memory used by this table's entries, in bytes."""
+        return sys.getsizeof(self.entries) + sum(sys.getsizeof(row) + sys.getsizeof(evaluation) for row, evaluation in self.entries.items())
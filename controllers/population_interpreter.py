@@ -0,0 +1,115 @@
+import controllers.flat_tree as flat_tree_class
+import operator
+import random
+
+
+# Assign new opcode names
+NUM_FUNCTION_OPCODES = flat_tree_class.NUM_FUNCTION_OPCODES
+GHOST_DIST = flat_tree_class.GHOST_DIST
+NUM_FEATURES = flat_tree_class.NUM_FEATURES
+FP_CONSTANT = flat_tree_class.FP_CONSTANT
+
+
+def divide(left, right):
+    """Divides left by right, producing 0.0 if either operand is 0.0."""
+    if left == 0.0 or right == 0.0:
+        return 0.0
+
+    return left / right
+
+
+def random_float(left, right):
+    """Draws a random FP value between the smaller and the larger operand."""
+    return random.uniform(min(left, right), max(left, right))
+
+
+# Element-wise operations indexed by function opcode
+OPERATIONS = {
+    flat_tree_class.ADD: operator.add,
+    flat_tree_class.SUBTRACT: operator.sub,
+    flat_tree_class.MULTIPLY: operator.mul,
+    flat_tree_class.DIVIDE: divide,
+    flat_tree_class.RANDOM_FLOAT: random_float
+}
+
+
+class PopulationInterpreter:
+    def __init__(self, flat_trees):
+        """Initializes the PopulationInterpreter class.
+
+        Where flat_trees is a list of FlatTree genomes, one per individual.
+
+        Each genome is converted to a postfix program once. The programs are then
+        scheduled position by position: at every program position, the individuals
+        whose programs have the same opcode there are grouped together so each
+        opcode is dispatched once per group rather than once per individual.
+        """
+        self.num_individuals = len(flat_trees)
+
+        # self.schedule[position] is a list of (opcode, individuals, constants)
+        # groups, where constants holds the FP constant of each individual in
+        # the group (only meaningful for FP_CONSTANT)
+        self.schedule = []
+
+        for individual, flat_tree in enumerate(flat_trees):
+            postfix_order = []
+            flat_tree.fold(lambda index : postfix_order.append(index), lambda index, left, right : postfix_order.append(index))
+
+            for position, index in enumerate(postfix_order):
+                if position == len(self.schedule):
+                    self.schedule.append({})
+
+                opcode = flat_tree.opcodes[index]
+
+                if not opcode in self.schedule[position]:
+                    self.schedule[position][opcode] = ([], [])
+
+                self.schedule[position][opcode][0].append(individual)
+                self.schedule[position][opcode][1].append(flat_tree.constants[index])
+
+        self.schedule = [[(opcode, individuals, constants) for opcode, (individuals, constants) in groups.items()] for groups in self.schedule]
+
+
+    def evaluate(self, features):
+        """Evaluates every genome on its own feature matrix.
+
+        Where features[i] is the feature matrix of individual i (see
+        PacmanController.get_features()), typically holding one row per
+        candidate move.
+
+        Returns a list holding, for each individual, a list of one FP value per
+        row of its feature matrix.
+        """
+        # Transpose each feature matrix into FP columns, one per terminal
+        columns = []
+        for rows in features:
+            if rows:
+                columns.append([[float(value) for value in column] for column in zip(*rows)])
+
+            else:
+                columns.append([[] for _ in range(NUM_FEATURES)])
+
+        stacks = [[] for _ in range(self.num_individuals)]
+
+        for groups in self.schedule:
+            for opcode, individuals, constants in groups:
+                if opcode == FP_CONSTANT:
+                    for individual, constant in zip(individuals, constants):
+                        stacks[individual].append([constant] * len(features[individual]))
+
+                elif opcode >= NUM_FUNCTION_OPCODES:
+                    column_index = opcode - GHOST_DIST
+
+                    for individual in individuals:
+                        stacks[individual].append(columns[individual][column_index])
+
+                else:
+                    operation = OPERATIONS[opcode]
+
+                    for individual in individuals:
+                        stack = stacks[individual]
+                        right = stack.pop()
+                        left = stack.pop()
+                        stack.append(list(map(operation, left, right)))
+
+        return [stack[0] for stack in stacks]
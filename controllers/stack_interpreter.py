@@ -0,0 +1,73 @@
+import controllers.flat_tree as flat_tree_class
+import controllers.population_interpreter as population_interpreter_class
+
+
+# Assign new opcode names
+NUM_FUNCTION_OPCODES = flat_tree_class.NUM_FUNCTION_OPCODES
+GHOST_DIST = flat_tree_class.GHOST_DIST
+FP_CONSTANT = flat_tree_class.FP_CONSTANT
+
+OPERATIONS = population_interpreter_class.OPERATIONS
+
+
+# Instruction kinds
+PUSH_CONSTANT = 0
+PUSH_FEATURE = 1
+APPLY_FUNCTION = 2
+
+
+class StackInterpreter:
+    def __init__(self, flat_tree):
+        """Initializes the StackInterpreter class.
+
+        Where flat_tree is the FlatTree to evaluate.
+
+        The tree is converted once to a postfix program: a list of (kind, operand)
+        instructions, where operand is the FP constant pushed by PUSH_CONSTANT,
+        the feature matrix column pushed by PUSH_FEATURE or the operation
+        (see PopulationInterpreter) applied by APPLY_FUNCTION to the top two
+        values of the stack. Evaluating the program walks it once per row with
+        an explicit value stack, so no Python recursion is involved however deep
+        the tree is.
+        """
+        self.program = []
+
+        def get_leaf_result(index):
+            if flat_tree.opcodes[index] == FP_CONSTANT:
+                self.program.append((PUSH_CONSTANT, flat_tree.constants[index]))
+
+            else:
+                self.program.append((PUSH_FEATURE, flat_tree.opcodes[index] - GHOST_DIST))
+
+
+        # Note: fold() visits the left operand first, preserving the order in
+        # which RANDOM_FLOAT nodes consume random numbers
+        flat_tree.fold(get_leaf_result, lambda index, left, right : self.program.append((APPLY_FUNCTION, OPERATIONS[flat_tree.opcodes[index]])))
+
+
+    def __call__(self, features):
+        """Rates every row of the feature matrix features (see
+        PacmanController.get_features()), returning a list of FP values.
+
+        Rows are evaluated in order, consuming random numbers exactly as the
+        compiled state evaluator does.
+        """
+        evaluations = []
+
+        for row in features:
+            stack = []
+
+            for kind, operand in self.program:
+                if kind == APPLY_FUNCTION:
+                    right = stack.pop()
+                    stack[-1] = operand(stack[-1], right)
+
+                elif kind == PUSH_FEATURE:
+                    stack.append(float(row[operand]))
+
+                else:
+                    stack.append(operand)
+
+            evaluations.append(stack[0])
+
+        return evaluations
@@ -1,4 +1,4 @@
-import math
+import bisect
 import random
 
 
@@ -24,6 +24,15 @@ class Tree:
         self.list = [TreeNode(index, None) for index in range(STARTING_TREE_SIZE)]
         self.list[0] = TreeNode(0, root_value)
 
+        # Sorted indices of the nodes holding a value (live nodes), maintained
+        # as nodes are set so that size, height and random node queries never
+        # scan the (mostly empty) node list
+        self.live_indices = [0] if root_value else []
+
+        # Note: a shared node list also belongs to copies of this tree (see __copy__()),
+        # so it must be copied before it is modified
+        self.is_shared = False
+
     
     def __str__(self):
         ret = '['
@@ -44,7 +53,66 @@ class Tree:
 
 
     def __setitem__(self, index, value):
+        self.unshare()
         self.list[index] = value
+        self.update_live_indices(index, value.value)
+
+
+    def __copy__(self):
+        """Returns a copy of this tree which shares its node list with this tree
+        until either of them is modified (copy-on-write).
+        """
+        other = type(self).__new__(type(self))
+        other.list = self.list
+        other.live_indices = self.live_indices
+        other.is_shared = True
+        self.is_shared = True
+
+        return other
+
+
+    def unshare(self):
+        """Gives this tree its own copy of its node list if the list is shared.
+
+        This must be called before any node of this tree is modified.
+        """
+        if self.is_shared:
+            self.list = [TreeNode(node.index, node.value) for node in self.list]
+            self.live_indices = self.live_indices[:]
+            self.is_shared = False
+
+
+    def set_value(self, index, value):
+        """Sets the value of the node at index."""
+        self.unshare()
+        self.list[index].value = value
+        self.update_live_indices(index, value)
+
+
+    def update_live_indices(self, index, value):
+        """Records whether the node at index is live now that it holds value."""
+        position = bisect.bisect_left(self.live_indices, index)
+        is_listed = position < len(self.live_indices) and self.live_indices[position] == index
+
+        if value and not is_listed:
+            self.live_indices.insert(position, index)
+
+        elif not value and is_listed:
+            del self.live_indices[position]
+
+
+    def get_num_nodes(self):
+        """Returns the number of live (non-None) nodes in this tree."""
+        return len(self.live_indices)
+
+
+    def get_rand_live_index(self):
+        """Returns the index of a live node chosen uniformly at random.
+
+        The choice consumes random numbers exactly as random.choices() over the
+        live nodes of self.list would.
+        """
+        return random.choices(self.live_indices)[0]
 
 
     def get_parent(self, node):
@@ -98,27 +166,85 @@ class Tree:
 
     def get_height(self):
         """Returns the maximum depth (height) of this tree."""
-        counter = 0
-
-        for n in self.list[::-1]:
-            if n.value != None:
-                return math.ceil(math.log2(len(self.list) - counter))
+        if self.live_indices:
+            return self.get_depth(self.live_indices[-1])
 
-            counter += 1
-        
         return 1
 
 
+    def get_depth(self, index):
+        """Returns the depth of the node at index, the root being at depth 1."""
+        return (index + 1).bit_length()
+
+
+    def get_preorder_indices(self, index=0):
+        """Returns the indices of the live nodes of the branch rooted at index,
+        each node coming before its left branch and its left branch before its
+        right branch.
+
+        Note: this walks the tree with an explicit stack, so it works at any depth.
+        """
+        preorder_indices = []
+        index_stack = [index]
+
+        while index_stack:
+            index = index_stack.pop()
+
+            if index < len(self.list) and self.list[index].value:
+                preorder_indices.append(index)
+                index_stack += [2 * index + 2, 2 * index + 1]
+
+        return preorder_indices
+
+
+    def remove_branch(self, index):
+        """Sets the node at index and every node below it to None."""
+        for index in self.get_preorder_indices(index):
+            self.set_value(index, None)
+
+
+    def graft(self, index, donor, donor_index, max_height=None):
+        """Replaces the branch rooted at index with a copy of the branch of the
+        donor tree rooted at donor_index.
+
+        If max_height is given, donor nodes which would lie deeper than max_height
+        are not copied (so no space is allocated for them). Returns True if any
+        node was left out this way, False otherwise.
+        """
+        self.remove_branch(index)
+
+        is_truncated = False
+        index_pairs = [(index, donor_index)]
+
+        while index_pairs:
+            index, donor_index = index_pairs.pop()
+
+            if donor_index >= len(donor) or not donor[donor_index].value:
+                continue
+
+            if max_height and self.get_depth(index) > max_height:
+                is_truncated = True
+                continue
+
+            self.add_node_at_index(index, donor[donor_index].value)
+            index_pairs += [(2 * index + 1, 2 * donor_index + 1), (2 * index + 2, 2 * donor_index + 2)]
+
+        return is_truncated
+
+
     def add_node_at_index(self, index, value):
         """Creates a new TreeNode object in self.list at index.
 
         Allocates more space for the tree list as needed.
         """
+        self.unshare()
+
         if index >= len(self.list):
             # Allocate more space for this list
             self.list = self.list + [TreeNode(index, None) for index in range(len(self.list), len(self.list) * 2)]
 
         self.list[index].value = value
+        self.update_live_indices(index, value)
 
 
     def add_node_left(self, parent_node, value=None):
@@ -0,0 +1,125 @@
+import controllers.flat_tree as flat_tree_class
+import controllers.nodes as nodes_classes
+import math
+import random
+
+
+# Assign new node class names
+functions = nodes_classes.FunctionNodes
+
+
+# Constant declarations
+COMPILED_BATCH_FUNCTION_NAME = 'compiled_batch_state_evaluator'
+
+# Note: the order of the feature names is the order of the columns of a feature matrix
+FEATURE_NAMES = ['ghost_distance', 'pill_distance', 'fruit_distance', 'num_adj_walls',
+    'ghost_maze_distance', 'pill_maze_distance', 'fruit_maze_distance']
+
+ARITHMETIC_OPERATORS = {
+    functions.ADD: '+',
+    functions.SUBTRACT: '-',
+    functions.MULTIPLY: '*'
+}
+
+
+class TreeCompiler:
+    def __init__(self):
+        """Initializes the TreeCompiler class.
+
+        The TreeCompiler translates a state evaluator FlatTree into the source code
+        of a single straight-line Python function, which is then compiled once
+        and can be called any number of times without walking the tree.
+        """
+        self.namespace = {'uniform': random.uniform}
+
+
+    def compile_batch(self, flat_tree):
+        """Returns a native Python function that evaluates flat_tree (a FlatTree)
+        over a feature matrix.
+
+        The returned function has the signature f(features), where features is a
+        sequence of rows holding one value per name in FEATURE_NAMES, and returns
+        a list holding one FP value per row. Rows are evaluated in order, each
+        producing the same FP value (and consuming random numbers in the same
+        order) as the state evaluator would.
+        """
+        namespace = dict(self.namespace)
+        exec(self.generate_batch_source(flat_tree), namespace)
+
+        return namespace[COMPILED_BATCH_FUNCTION_NAME]
+
+
+    def generate_batch_source(self, flat_tree):
+        """Returns the source code of the compiled batch function for flat_tree as a string."""
+        statements, result = self.generate_statements(flat_tree)
+
+        lines = ['def %s(features):' % (COMPILED_BATCH_FUNCTION_NAME)]
+        lines.append('    evaluations = []')
+        lines.append('    for %s in features:' % (', '.join(FEATURE_NAMES)))
+        lines += ['        ' + statement for statement in statements]
+        lines.append('        evaluations.append(%s)' % (result))
+        lines.append('    return evaluations')
+
+        return '\n'.join(lines) + '\n'
+
+
+    def generate_statements(self, flat_tree):
+        """Returns the statements evaluating flat_tree (a FlatTree) and the name
+        of the variable (or the literal) holding the final result.
+        """
+        body = []
+        used_arguments = set([])
+
+        def get_leaf_source(index):
+            """Returns the name (or the literal) of the leaf at index."""
+            if flat_tree.opcodes[index] == flat_tree_class.FP_CONSTANT:
+                return self.generate_literal(float(flat_tree.constants[index]))
+
+            argument = FEATURE_NAMES[flat_tree.opcodes[index] - flat_tree_class.GHOST_DIST]
+            used_arguments.add(argument)
+
+            return argument
+
+
+        def get_function_source(index, left, right):
+            """Appends the statement evaluating the function node at index to body
+            and returns the name of the variable holding its value.
+            """
+            result = 't' + str(len(body))
+            body.append(self.generate_function_statement(flat_tree_class.OPCODES[flat_tree.opcodes[index]], result, left, right))
+
+            return result
+
+
+        # Note: fold() reduces the left operand first, preserving the order in
+        # which RANDOM_FLOAT nodes consume random numbers
+        result = flat_tree.fold(get_leaf_source, get_function_source)
+
+        # Terminal values are converted to FP values, as in the recursive state evaluator
+        header = ['%s = float(%s)' % (argument, argument) for argument in sorted(used_arguments)]
+
+        return header + body, result
+
+
+    def generate_function_statement(self, function, result, left, right):
+        """Returns the statement assigning function (a FunctionNodes value)
+        applied to the operands left and right to the variable result.
+        """
+        if function == functions.RANDOM_FLOAT:
+            return '%s = uniform(min(%s, %s), max(%s, %s))' % (result, left, right, left, right)
+
+        if function == functions.DIVIDE:
+            return '%s = 0.0 if %s == 0.0 or %s == 0.0 else %s / %s' % (result, left, right, left, right)
+
+        return '%s = %s %s %s' % (result, left, ARITHMETIC_OPERATORS[function], right)
+
+
+    def generate_literal(self, value):
+        """Returns the source code of the FP value value.
+
+        Note: folded constants may be infinite or NaN, which have no literal form.
+        """
+        if math.isfinite(value):
+            return repr(value)
+
+        return "float('%r')" % (value)
@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+
+import gp.worker_daemon as worker_daemon_class
+import util.args as args_class
+import util.config as config_class
+
+if __name__ == '__main__':
+
+    # Process command line arguments
+    # Note: the address is either '<host>:<port>' or 'unix:<path>'
+    args = args_class.Arguments(2, ['config/default.cfg', 'localhost:5401'])
+    config_file, address = args.get_args()
+
+
+    # Setup configuration
+    config = config_class.Config(config_file)
+
+
+    # Play the games sent by GP drivers until killed
+    print('Evaluation worker listening on %s' % (address))
+    worker_daemon_class.serve(config, address)
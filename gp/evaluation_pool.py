@@ -0,0 +1,109 @@
+import gp.game_runner as game_runner_class
+import gp.world_file as world_file_class
+import multiprocessing
+import os
+import random
+
+
+# Constant declarations
+SEED_BITS = 64
+
+
+# Note: each worker process plays its games with its own GameRunner (see init_worker())
+worker_game_runner = None
+
+
+def init_worker(config):
+    """Initializes an evaluation worker process with the given Config object."""
+    global worker_game_runner
+    worker_game_runner = game_runner_class.GameRunner(config)
+
+
+def play_game(task):
+    """Plays the game described by task (see EvaluationPool.play_games()) in a
+    worker process, returning its score and its transcript (world file string),
+    or None in place of the transcript if it was not requested.
+    """
+    opcodes, constants, seed, save_transcript = task
+    world = worker_game_runner.play_seeded_game(opcodes, constants, seed)
+
+    return world.score, world.world_file.file_str if save_transcript else None
+
+
+class GameRecord:
+    def __init__(self, game_runner, opcodes, constants, seed, score, transcript=None):
+        """Initializes the GameRecord class.
+
+        A GameRecord stands in for the finished GPacWorld of a game played by an
+        evaluation worker (see GameRunner.play_seeded_game()), holding its score
+        and its world file. If the worker did not return the transcript of the
+        game, the game is replayed with game_runner the first time the world file
+        is needed.
+        """
+        self.game_runner = game_runner
+        self.opcodes = opcodes
+        self.constants = constants
+        self.seed = seed
+        self.score = score
+        self.transcript = transcript
+
+
+    @property
+    def world_file(self):
+        """Returns the WorldFile of the recorded game."""
+        if self.transcript is None:
+            # Note: replaying must not disturb the random stream of the GP
+            random_state = random.getstate()
+            self.transcript = self.game_runner.play_seeded_game(self.opcodes, self.constants, self.seed).world_file.file_str
+            random.setstate(random_state)
+
+        world_file = world_file_class.WorldFile(self.game_runner.config)
+        world_file.file_str = self.transcript
+
+        return world_file
+
+
+class EvaluationPool:
+    def __init__(self, config):
+        """Initializes the EvaluationPool class.
+
+        Where config is a Config object.
+
+        The pool keeps 'num evaluation workers' worker processes (one per CPU if
+        0) alive for the whole experiment. Each game is shipped to a worker as
+        the FlatTree genome of its state evaluator and a world seed, and the
+        worker returns the score (and, if 'evaluation pool transcripts' is set,
+        the transcript) of the game. Seeds are drawn from the GP's random stream
+        in population order, so the results of a given seed do not depend on
+        the number of workers.
+        """
+        self.config = config
+
+        self.num_workers = int(self.config.settings['num evaluation workers']) or os.cpu_count()
+        self.save_transcripts = self.config.settings.getboolean('evaluation pool transcripts')
+
+        # Used to replay games whose transcripts were not returned
+        self.game_runner = game_runner_class.GameRunner(self.config)
+
+        self.pool = multiprocessing.Pool(self.num_workers, init_worker, (self.config,))
+
+
+    def play_games(self, population):
+        """Plays the game of every individual in population on the workers,
+        replacing the world of each individual by a GameRecord of its game.
+        """
+        tasks = []
+
+        for individual in population:
+            flat_state_evaluator = individual.pacman_cont.get_flat_state_evaluator()
+            tasks.append((flat_state_evaluator.opcodes, flat_state_evaluator.constants, random.getrandbits(SEED_BITS), self.save_transcripts))
+
+        for individual, task, (score, transcript) in zip(population, tasks, self.pool.map(play_game, tasks)):
+            opcodes, constants, seed, _ = task
+            individual.world = GameRecord(self.game_runner, opcodes, constants, seed, score, transcript)
+
+
+    def close(self):
+        """Shuts the worker processes down once they have finished their games."""
+        self.pool.close()
+        self.pool.join()
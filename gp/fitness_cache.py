@@ -0,0 +1,175 @@
+import collections
+import gp.probe_bank as probe_bank_class
+
+
+class FitnessCacheEntry:
+    def __init__(self):
+        """Initializes the FitnessCacheEntry class.
+
+        An entry accumulates the scores and worlds of every simulated game played
+        by one genotype.
+        """
+        self.total_score = 0
+        self.num_samples = 0
+        self.worlds = []
+
+
+    def add_sample(self, world):
+        """Adds the score of the game played in world (a finished GPacWorld) to this entry."""
+        self.total_score += world.score
+        self.num_samples += 1
+        self.worlds.append(world)
+
+
+    def get_fitness(self):
+        """Returns the mean score of the games played by this entry's genotype."""
+        return self.total_score // self.num_samples
+
+
+    def get_world(self):
+        """Returns the world of the game whose score is nearest to the fitness of
+        this entry, as the representative game of its genotype.
+
+        Note: with more than one sample per genotype, the score of that game may
+        still differ from the (mean) fitness.
+        """
+        fitness = self.get_fitness()
+
+        return min(self.worlds, key=lambda world : abs(world.score - fitness))
+
+
+class FitnessCache:
+    def __init__(self, config):
+        """Initializes the FitnessCache class.
+
+        Where config is a Config object.
+
+        The cache maps the genotype hash of a state evaluator (see
+        PacmanController.get_genotype_hash()) to a FitnessCacheEntry. Once a
+        genotype has played 'fitness cache samples' games, further individuals
+        with the same genotype reuse the mean score of those games (and the world
+        of the game nearest to it) instead of being simulated. At most 'fitness
+        cache size' genotypes are kept, the least recently used being evicted
+        first, and likewise for the cache keys of genotypes.
+
+        If behavioral fingerprinting is configured, genotypes are keyed by their
+        behavioral fingerprint on a ProbeBank instead (where they have one), so
+        structurally different genotypes choosing the same moves share an entry.
+        """
+        self.config = config
+
+        self.max_size = int(self.config.settings['fitness cache size'])
+        self.num_samples = int(self.config.settings['fitness cache samples'])
+
+        if self.config.settings.getboolean('use behavioral fingerprinting'):
+            self.probe_bank = probe_bank_class.ProbeBank(self.config)
+
+        else:
+            self.probe_bank = None
+
+        self.clear()
+
+
+    def clear(self):
+        """Removes every entry from the cache and resets its hit counters."""
+        self.entries = collections.OrderedDict()
+        self.num_lookups = 0
+        self.num_hits = 0
+
+        # Cache keys by genotype hash, least recently used first
+        self.keys = collections.OrderedDict()
+
+
+    def get_key(self, individual):
+        """Returns the cache key of the genotype of individual."""
+        genotype_hash = individual.pacman_cont.get_genotype_hash()
+
+        if genotype_hash in self.keys:
+            self.keys.move_to_end(genotype_hash)
+            return self.keys[genotype_hash]
+
+        fingerprint = self.probe_bank.get_fingerprint(individual.pacman_cont) if self.probe_bank else None
+
+        if fingerprint:
+            key = ('behavior', fingerprint)
+
+        else:
+            key = ('genotype', genotype_hash)
+
+        self.keys[genotype_hash] = key
+
+        while len(self.keys) > self.max_size:
+            # Evict the least recently used key
+            self.keys.popitem(last=False)
+
+        return key
+
+
+    def get_num_samples(self, key):
+        """Returns the number of games accumulated for the given cache key."""
+        if key in self.entries:
+            return self.entries[key].num_samples
+
+        return 0
+
+
+    def partition(self, population):
+        """Splits population into the individuals that must be simulated and
+        those whose fitness can be reused, returning both lists.
+
+        Duplicate genotypes within population are only simulated as many times
+        as needed to reach the required number of samples.
+        """
+        simulated_population = []
+        cached_population = []
+        num_scheduled_samples = collections.Counter()
+
+        for individual in population:
+            key = self.get_key(individual)
+            self.num_lookups += 1
+
+            if self.get_num_samples(key) + num_scheduled_samples[key] >= self.num_samples:
+                cached_population.append(individual)
+
+            else:
+                simulated_population.append(individual)
+                num_scheduled_samples[key] += 1
+
+        return simulated_population, cached_population
+
+
+    def add_sample(self, individual):
+        """Adds the finished game of individual to the entry of its genotype."""
+        key = self.get_key(individual)
+
+        if not key in self.entries:
+            self.entries[key] = FitnessCacheEntry()
+
+        self.entries[key].add_sample(individual.world)
+        self.entries.move_to_end(key)
+
+        while len(self.entries) > self.max_size:
+            # Evict the least recently used entry
+            self.entries.popitem(last=False)
+
+
+    def reuse(self, individual):
+        """Assigns the cached fitness (and representative world, see
+        FitnessCacheEntry.get_world()) of its genotype to individual.
+
+        Returns True if the genotype was found in the cache, False otherwise (in
+        which case individual must be simulated).
+        """
+        key = self.get_key(individual)
+
+        if not key in self.entries:
+            return False
+
+        entry = self.entries[key]
+        self.entries.move_to_end(key)
+        self.num_hits += 1
+
+        individual.world = entry.get_world()
+        individual.fitness = entry.get_fitness()
+
+        return True
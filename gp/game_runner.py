@@ -0,0 +1,128 @@
+import controllers.feature_frame as feature_frame_class
+import controllers.flat_tree as flat_tree_class
+import controllers.game_state as game_state_class
+import controllers.ghosts_controller as ghosts_cont_class
+import controllers.pacman_controller as pacman_cont_class
+import gp.gpac_world_individual as gpac_world_individual_class
+import random
+import world.gpac_world as gpac_world_class
+
+
+class GameRunner:
+    def __init__(self, config):
+        """Initializes the GameRunner class.
+
+        Where config is a Config object.
+
+        A GameRunner creates worlds and plays the game of an individual (a
+        GPacWorldIndividual) in its world until completion. It holds no other
+        state, so evaluation worker processes use it to play games on their own.
+        """
+        self.config = config
+
+
+    def create_world(self):
+        """Returns a new random GPacWorld and the GameState of its initial state."""
+        world = gpac_world_class.GPacWorld(self.config)
+        game_state = game_state_class.GameState(world.pacman_coords, world.ghost_coords, world.pill_coords, self.get_num_adj_walls(world, world.pacman_coords[0]))
+        game_state.update_walls(world.wall_coords, world.passability_grid)
+        game_state.update_distance_fields(world.pill_distance_field, world.pill_maze_distance_field)
+        game_state.update_ghost_index(world.ghost_index)
+
+        return world, game_state
+
+
+    def play_game(self, individual):
+        """Runs individual's game until completion."""
+        while self.check_game_over(individual):
+            self.move_units(individual)
+
+
+    def play_seeded_game(self, opcodes, constants, seed):
+        """Plays the game of the state evaluator genome with the given FlatTree
+        opcodes and constants in a new world, returning the finished world.
+
+        The random number generator is seeded with seed beforehand, so the world
+        and the game only depend on the arguments.
+        """
+        random.seed(seed)
+
+        state_evaluator = flat_tree_class.FlatTree(self.config, opcodes, constants).to_tree()
+        pacman_cont = pacman_cont_class.PacmanController(self.config, state_evaluator)
+        ghosts_cont = ghosts_cont_class.GhostsController(self.config)
+        world, game_state = self.create_world()
+
+        self.play_game(gpac_world_individual_class.GPacWorldIndividual(world, game_state, pacman_cont, ghosts_cont))
+
+        return world
+
+
+    def update_game_state(self, individual):
+        """Updates the state of the game *before* all characters have moved."""
+        if len(individual.world.fruit_coord):
+            fruit_coord = individual.world.fruit_coord
+
+        else:
+            fruit_coord = None
+
+        individual.game_state.update(individual.world.pacman_coords, individual.world.ghost_coords, individual.world.pill_coords, self.get_num_adj_walls(individual.world, individual.world.pacman_coords[0]), fruit_coord)
+
+        # Gather the features of pacman's candidate moves once for this tick
+        individual.game_state.update_feature_frame(feature_frame_class.FeatureFrame.from_game_state(individual.game_state))
+
+
+    def move_units(self, individual):
+        """Moves all units in individual.world based on the unit controller moves.
+        
+        Before units are moved, a fruit probabilistically spawns and the game state
+        is updated.
+
+        After units are moved, game variables are updated.
+        """
+        individual.world.randomly_spawn_fruit()
+
+        self.update_game_state(individual)
+
+        individual.world.move_pacman(individual.pacman_cont.get_move(individual.game_state))
+
+        for ghost_id in range(len(individual.world.ghost_coords)):
+            individual.world.move_ghost(ghost_id, individual.ghosts_cont.get_move(ghost_id, individual.game_state))
+
+        # Update time remaining
+        individual.world.time_remaining -= 1
+
+        for pacman_coord in individual.world.pacman_coords:
+            # Update pills
+            if individual.world.has_pill(pacman_coord):
+                individual.world.remove_pill(pacman_coord)
+                individual.world.num_pills_consumed += 1
+
+            # Update fruit
+            if individual.world.has_fruit(pacman_coord):
+                individual.world.remove_fruit(pacman_coord)
+                individual.world.num_fruit_consumed += 1
+
+        # Update score
+        individual.world.update_score()
+
+        # Update the world state
+        individual.world.world_file.save_snapshot(individual.world.pacman_coords,
+            individual.world.ghost_coords, individual.world.fruit_coord, 
+            individual.world.time_remaining, individual.world.score)
+
+
+    def check_game_over(self, individual):
+        """Returns False if the game is over for the given individual (allowing for a loop to terminate), 
+        and True otherwise.
+
+        The conditions for game over are seen in check_game_over() in the GPacWorld class.
+        """
+        if individual.world.check_game_over():
+            return False
+
+        return True
+
+
+    def get_num_adj_walls(self, world, coord):
+        """Returns the number of walls adjacent to coord in the given world."""
+        return world.passability_grid.num_adj_walls[world.passability_grid.get_cell(coord.x, coord.y)]
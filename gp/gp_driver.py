@@ -1,24 +1,28 @@
-import controllers.game_state as game_state_class
+import controllers.flat_tree as flat_tree_class
 import controllers.ghosts_controller as ghosts_cont_class
 import controllers.pacman_controller as pacman_cont_class
-import controllers.tree as tree
+import controllers.population_interpreter as population_interpreter_class
 import copy
+import gp.evaluation_pool as evaluation_pool_class
+import gp.fitness_cache as fitness_cache_class
+import gp.game_runner as game_runner_class
 import gp.gpac_world_individual as gpac_world_individual_class
 import gp.log as log_class
+import gp.remote_evaluation_pool as remote_evaluation_pool_class
 import gp.soln as soln_class
 import math
 import random
 import util.seed as seed_class
-import world.gpac_world as gpac_world_class
+import world.lockstep_simulator as lockstep_simulator_class
 
 
-class GPDriver:
+class GPDriver(game_runner_class.GameRunner):
     def __init__(self, config):
         """Initializes the GPDriver class.
         
         Where config is a Config object.
         """
-        self.config = config
+        super().__init__(config)
 
         self.seed = seed_class.Seed(self.config)
 
@@ -36,6 +40,36 @@ class GPDriver:
         self.log = log_class.Log(self.config, self.seed, overwrite=True)
         self.soln = soln_class.Solution(self.config)
 
+        # Note: the tree limit policy is one of 'reject', 'retry' or 'truncate'
+        self.max_tree_height = int(self.config.settings['max tree height'])
+        self.max_tree_size = int(self.config.settings['max tree size'])
+        self.tree_limit_policy = self.config.settings['tree limit policy']
+        self.num_tree_limit_violations = 0
+
+        self.use_policy_tables = self.config.settings.getboolean('use policy tables')
+
+        if self.config.settings.getboolean('use fitness cache'):
+            self.fitness_cache = fitness_cache_class.FitnessCache(self.config)
+
+        else:
+            self.fitness_cache = None
+
+        self.use_steady_state = self.config.settings.getboolean('use steady state')
+
+        # Note: steady-state runs play their games on a worker pool of their own (see steady_state),
+        # and island and parallel runs in processes of their own (see island_model and run_pool)
+        use_own_workers = self.use_steady_state or int(self.config.settings['num islands']) > 1 or int(self.config.settings['num parallel runs']) > 1
+        self.use_remote_evaluation = not use_own_workers and self.config.settings.getboolean('use remote evaluation')
+
+        if self.use_remote_evaluation:
+            self.evaluation_pool = remote_evaluation_pool_class.RemoteEvaluationPool(self.config)
+
+        elif not use_own_workers and self.config.settings.getboolean('use evaluation pool'):
+            self.evaluation_pool = evaluation_pool_class.EvaluationPool(self.config)
+
+        else:
+            self.evaluation_pool = None
+
         self.local_best_score = -1
         self.global_best_score = -1
 
@@ -57,14 +91,27 @@ class GPDriver:
         self.stale_score_count_termination = 0
         self.log.write_run_header(self.run_count)
 
+        # Policy table statistics of this run (see update_policy_table_stats())
+        self.num_policy_table_lookups = 0
+        self.num_policy_table_hits = 0
+        self.max_num_policy_table_entries = 0
+        self.max_policy_table_memory_size = 0
+
+        if self.fitness_cache:
+            # Fitness samples are not shared between runs
+            self.fitness_cache.clear()
+
         # Initialize the population
         self.population = []
         for _ in range(self.population_size):
-            world = gpac_world_class.GPacWorld(self.config)
-            game_state = game_state_class.GameState(world.pacman_coords, world.ghost_coords, world.pill_coords, self.get_num_adj_walls(world, world.pacman_coords[0]))
+            world, game_state = self.create_world()
             pacman_cont = pacman_cont_class.PacmanController(self.config)
             ghosts_cont = ghosts_cont_class.GhostsController(self.config)
-            game_state.update_walls(world.wall_coords)
+
+            # Note: 'max tree generation height' may exceed the tree limits, and retrying
+            # would never succeed, so initial state evaluators are truncated whatever the policy
+            if self.exceeds_tree_limits(pacman_cont):
+                pacman_cont.truncate(self.max_tree_height, self.max_tree_size)
 
             self.population.append(gpac_world_individual_class.GPacWorldIndividual(world, game_state, pacman_cont, ghosts_cont))
 
@@ -74,9 +121,101 @@ class GPDriver:
         
         This should be called after each run.
         """
+        if self.fitness_cache:
+            self.log.write_fitness_cache_stats(self.fitness_cache.num_hits, self.fitness_cache.num_lookups)
+
+        if self.use_policy_tables:
+            self.log.write_policy_table_stats(self.num_policy_table_hits, self.num_policy_table_lookups,
+                self.max_num_policy_table_entries, self.max_policy_table_memory_size)
+
+        if self.use_remote_evaluation:
+            for worker in self.evaluation_pool.workers:
+                self.log.write_remote_worker_stats(worker.address, worker.num_jobs, worker.busy_time, worker.num_failures)
+                worker.reset_counters()
+
         self.run_count += 1
 
 
+    def run(self):
+        """Performs a complete run of the GP, from the initial population to
+        termination.
+        """
+        self.begin_run()
+
+        self.evaluate(self.population)
+
+        while self.decide_termination():
+            self.step()
+
+        self.end_run()
+
+
+    def step(self):
+        """Advances the population by one generation."""
+        if self.config.settings.getboolean('control bloat'):
+            self.control_bloat()
+
+        self.select_parents()
+
+        self.recombine()
+
+        self.mutate()
+
+        self.evaluate(self.children)
+
+        self.select_for_survival()
+
+
+    def get_emigrants(self, num_emigrants):
+        """Returns the FlatTree genomes, as (opcodes, constants) pairs, of the
+        num_emigrants fittest individuals of the population.
+        """
+        emigrants = sorted(self.population, key=lambda x : x.fitness, reverse=True)[:num_emigrants]
+        flat_state_evaluators = [individual.pacman_cont.get_flat_state_evaluator() for individual in emigrants]
+
+        return [(flat_state_evaluator.opcodes, flat_state_evaluator.constants) for flat_state_evaluator in flat_state_evaluators]
+
+
+    def immigrate(self, genomes):
+        """Replaces the least fit individuals of the population by individuals
+        with the given FlatTree genomes ((opcodes, constants) pairs).
+
+        The immigrants play a game in a new world of this population, which
+        counts as an evaluation. Once they have joined the population, a log row
+        is written and the best scores are updated, as after a generation.
+        """
+        immigrants = []
+
+        for opcodes, constants in genomes[:self.population_size]:
+            world, game_state = self.create_world()
+            state_evaluator = flat_tree_class.FlatTree(self.config, opcodes, constants).to_tree()
+            pacman_cont = pacman_cont_class.PacmanController(self.config, state_evaluator)
+            ghosts_cont = ghosts_cont_class.GhostsController(self.config)
+
+            immigrants.append(gpac_world_individual_class.GPacWorldIndividual(world, game_state, pacman_cont, ghosts_cont))
+
+        self.play_games(immigrants)
+
+        for individual in immigrants:
+            self.end_eval(individual)
+
+        self.sort_individuals(self.population)
+        self.population[len(self.population) - len(immigrants):] = immigrants
+
+        self.check_update_log_world_files()
+
+
+    def close(self):
+        """Shuts the evaluation pool (if any) down and closes the log file.
+
+        This should be called once all runs are over.
+        """
+        if self.evaluation_pool:
+            self.evaluation_pool.close()
+
+        self.log.close()
+
+
     def end_eval(self, individual):
         """Conditionally updates the log and world files and increments 
         the evaluation count.
@@ -91,29 +230,131 @@ class GPDriver:
         """Adjusts the fitness of each individual in the population by applying 
         parsimony pressure.
         """
-        avg_num_nodes = int(sum([individual.pacman_cont.get_num_nodes() for individual in self.population]) / self.population_size)
+        avg_num_nodes = self.get_avg_num_nodes()
 
         for individual in self.population:
-            num_nodes = individual.pacman_cont.get_num_nodes()
+            self.apply_parsimony_pressure(individual, avg_num_nodes)
+
+
+    def get_avg_num_nodes(self):
+        """Returns the average number of state evaluator nodes in the population."""
+        return int(sum([individual.pacman_cont.get_num_nodes() for individual in self.population]) / self.population_size)
+
+
+    def apply_parsimony_pressure(self, individual, avg_num_nodes):
+        """Divides the fitness of individual by a penalty proportional to its
+        number of state evaluator nodes beyond avg_num_nodes.
+        """
+        num_nodes = individual.pacman_cont.get_num_nodes()
 
-            if  num_nodes > avg_num_nodes:
-                individual.fitness /= int(float(self.config.settings['p parsimony coefficient']) * (num_nodes - avg_num_nodes))
-                individual.fitness = int(individual.fitness)
+        if  num_nodes > avg_num_nodes:
+            individual.fitness /= int(float(self.config.settings['p parsimony coefficient']) * (num_nodes - avg_num_nodes))
+            individual.fitness = int(individual.fitness)
 
 
     def evaluate(self, population):
         """Evaluates all population members given in population by running
         each world's game until completion.
+
+        If a fitness cache is configured, individuals whose genotype has already
+        been played enough games reuse its fitness instead (see FitnessCache).
         """
-        for individual in population:
-            while self.check_game_over(individual):
-                self.move_units(individual)
+        if self.fitness_cache:
+            simulated_population, cached_population = self.fitness_cache.partition(population)
+
+        else:
+            simulated_population, cached_population = population, []
+
+        self.play_games(simulated_population)
 
+        for individual in simulated_population:
             self.end_eval(individual)
 
+            if self.fitness_cache:
+                self.fitness_cache.add_sample(individual)
+
+        for individual in cached_population:
+            if self.fitness_cache.reuse(individual):
+                self.eval_count += 1
+
+            else:
+                # The genotype's entry has been evicted, so the game must be played after all
+                self.play_games([individual])
+                self.end_eval(individual)
+                self.fitness_cache.add_sample(individual)
+
+        if self.use_policy_tables:
+            self.update_policy_table_stats(population)
+
         self.check_update_log_world_files()
 
 
+    def play_games(self, population):
+        """Runs each world's game in population until completion.
+
+        If lockstep evaluation is configured, all games are advanced together 
+        one tick at a time (see evaluate_lockstep()). Otherwise, if an evaluation
+        pool is configured, the games are played by its worker processes (see
+        EvaluationPool), or by remote worker daemons if remote evaluation is
+        configured (see RemoteEvaluationPool).
+        """
+        if self.config.settings.getboolean('use lockstep evaluation'):
+            self.evaluate_lockstep(population)
+
+        elif self.evaluation_pool:
+            self.evaluation_pool.play_games(population)
+
+        else:
+            for individual in population:
+                self.play_game(individual)
+
+
+    def create_world(self):
+        """Returns a new random GPacWorld and the GameState of its initial state.
+
+        Note: if an evaluation pool is configured or the run is steady-state,
+        worlds are generated by worker processes instead, so (None, None) is
+        returned.
+        """
+        if (self.evaluation_pool or self.use_steady_state) and not self.config.settings.getboolean('use lockstep evaluation'):
+            return None, None
+
+        return super().create_world()
+
+
+    def update_policy_table_stats(self, population):
+        """Adds the lookups made in the policy tables of population (see
+        PacmanController.get_policy_table()) since they were last counted to this
+        run's totals, and updates the largest number of entries and memory size
+        of the policy tables of an evaluated population.
+
+        Note: lockstep evaluation does not use policy tables, and the policy
+        tables of games played by an evaluation pool stay in its workers.
+        """
+        # Note: policy tables shared by copied controllers are only counted once
+        policy_tables = {id(individual.pacman_cont.policy_table): individual.pacman_cont.policy_table for individual in population if individual.pacman_cont.policy_table}
+
+        for policy_table in policy_tables.values():
+            self.num_policy_table_lookups += policy_table.num_lookups
+            self.num_policy_table_hits += policy_table.num_hits
+            policy_table.reset_counters()
+
+        self.max_num_policy_table_entries = max(self.max_num_policy_table_entries, sum(len(policy_table.entries) for policy_table in policy_tables.values()))
+        self.max_policy_table_memory_size = max(self.max_policy_table_memory_size, sum(policy_table.get_memory_size() for policy_table in policy_tables.values()))
+
+
+    def evaluate_lockstep(self, population):
+        """Runs the games of all population members in lockstep until every game
+        is over, rating the candidate moves of all worlds with a single
+        population-wide interpreter call per tick.
+        """
+        simulator = lockstep_simulator_class.LockstepSimulator(self.config, [individual.world for individual in population])
+        interpreter = population_interpreter_class.PopulationInterpreter([individual.pacman_cont.get_simplified_state_evaluator() for individual in population])
+
+        while simulator.step(interpreter.evaluate):
+            pass
+
+
     def select_parents(self):
         """Chooses which parents from the population will breed.
 
@@ -171,44 +412,46 @@ class GPDriver:
                 self.parents += random.choices(sub_elite_group, weights=sub_elite_choices, k=num_sub_elite_parents)
                  
 
-    def recombine(self):
-        """Breeds lambda (offspring pool size) children using sub-tree crossover 
-        from the existing parent population. The resulting children are stored in 
-        self.children.
+    def recombine(self, num_children=None):
+        """Breeds lambda (offspring pool size) children, or num_children if given,
+        using sub-tree crossover from the existing parent population. The resulting
+        children are stored in self.children.
         """
 
         def breed(parent_a, parent_b):
-            """Performs sub-tree crossover on parent_a and parent_b returning the child tree."""
-
-            def crossover_recursive(receiver_index, donator_index):
-                if receiver_index < len(child_pacman_cont.state_evaluator) and donator_index < len(parent_pacman_cont.state_evaluator):
-                    return
-                
-                child_pacman_cont.state_evaluator[receiver_index] = tree.TreeNode(receiver_index, parent_pacman_cont.state_evaluator[donator_index].value)
-                crossover_recursive(child_pacman_cont.state_evaluator.get_left_child_index(receiver_index), parent_pacman_cont.state_evaluator.get_left_child_index(donator_index))
-                crossover_recursive(child_pacman_cont.state_evaluator.get_right_child_index(receiver_index), parent_pacman_cont.state_evaluator.get_right_child_index(donator_index))
-
-
-            # Choose a random node (crossover point) from each state evaluator node list
-            crossover_node_a = parent_a.pacman_cont.state_evaluator[random.choices([n for n in parent_a.pacman_cont.state_evaluator if n.value])[0].index]
-            crossover_node_b = parent_b.pacman_cont.state_evaluator[random.choices([n for n in parent_b.pacman_cont.state_evaluator if n.value])[0].index]
+            """Performs sub-tree crossover on parent_a and parent_b returning the child tree.
+
+            The child is a copy of parent_a whose branch at a random crossover point
+            is replaced by the branch of parent_b at another. Children exceeding the
+            tree limits are handled according to the tree limit policy.
+            """
+            for _ in range(self.get_num_tree_limit_attempts()):
+                # Choose a random node (crossover point) from each state evaluator node list
+                crossover_node_a = parent_a.pacman_cont.state_evaluator[parent_a.pacman_cont.state_evaluator.get_rand_live_index()]
+                crossover_node_b = parent_b.pacman_cont.state_evaluator[parent_b.pacman_cont.state_evaluator.get_rand_live_index()]
+
+                # Perform sub-tree crossover
+                child_pacman_cont = copy.copy(parent_a.pacman_cont)
+                is_truncated = child_pacman_cont.state_evaluator.graft(crossover_node_a.index, parent_b.pacman_cont.state_evaluator, crossover_node_b.index, self.max_tree_height)
+                child_pacman_cont.invalidate_compiled_state_evaluator()
+
+                if not is_truncated and not self.exceeds_tree_limits(child_pacman_cont):
+                    break
 
-            child_pacman_cont = copy.copy(parent_a.pacman_cont)
-            parent_pacman_cont = parent_b.pacman_cont
+                self.num_tree_limit_violations += 1
 
-            # Extend the child's state evaluator if necessary
-            if len(child_pacman_cont.state_evaluator) < len(parent_a.pacman_cont.state_evaluator):
-                child_pacman_cont.state_evaluator = child_pacman_cont.state_evaluator + [tree.TreeNode(index, None) for index in range(len(child_pacman_cont.state_evaluator), len(parent_a.pacman_cont.state_evaluator))]
+                if self.tree_limit_policy == 'truncate':
+                    child_pacman_cont.truncate(self.max_tree_height, self.max_tree_size)
+                    break
 
-            # Perform sub-tree crossover
-            crossover_recursive(crossover_node_a.index, crossover_node_b.index)
+            else:
+                # Reject the crossover
+                child_pacman_cont = copy.copy(parent_a.pacman_cont)
 
             # Finish generating the child
-            world = gpac_world_class.GPacWorld(self.config)
-            game_state = game_state_class.GameState(world.pacman_coords, world.ghost_coords, world.pill_coords, self.get_num_adj_walls(world, world.pacman_coords[0]))
+            world, game_state = self.create_world()
             pacman_cont = child_pacman_cont
             ghosts_cont = parent_a.ghosts_cont
-            game_state.update_walls(world.wall_coords)
 
             child = gpac_world_individual_class.GPacWorldIndividual(world, game_state, pacman_cont, ghosts_cont)
             return child
@@ -216,7 +459,7 @@ class GPDriver:
 
         self.children = []
 
-        for _ in range(self.child_population_size):
+        for _ in range(num_children if num_children else self.child_population_size):
             # Select parents with replacement
             # Note: this implementation allows for parent_a and parent_b to be the same genotype
             parent_a = self.parents[random.randrange(0, len(self.parents))]
@@ -228,26 +471,49 @@ class GPDriver:
 
     def mutate(self):
         """Probabilistically performs sub-tree mutation on each child in the child population."""
+        for child in self.children:
+            if random.random() < float(self.config.settings['mutation rate']):
+                for _ in range(self.get_num_tree_limit_attempts()):
+                    mutant_pacman_cont = copy.copy(child.pacman_cont)
 
-        def nullify(state_evaluator, node):
-            """Recursively sets this node and its branch to the None node."""
-            state_evaluator[node.index].value = None
+                    # Choose mutation node
+                    mutation_node = mutant_pacman_cont.state_evaluator[mutant_pacman_cont.state_evaluator.get_rand_live_index()]
 
-            if not state_evaluator.is_leaf(node):
-                nullify(state_evaluator, state_evaluator.get_left_child(node))
-                nullify(state_evaluator, state_evaluator.get_right_child(node))
+                    # Remove traces of previous subtree
+                    mutant_pacman_cont.state_evaluator.remove_branch(mutation_node.index)
 
+                    # Grow a new subtree
+                    is_truncated = mutant_pacman_cont.grow(mutation_node, self.max_tree_height)
 
-        for child in self.children:
-            if random.random() < float(self.config.settings['mutation rate']):
-                # Choose mutation node
-                mutation_node = child.pacman_cont.state_evaluator[random.choices([n for n in child.pacman_cont.state_evaluator if n.value])[0].index]
+                    if not is_truncated and not self.exceeds_tree_limits(mutant_pacman_cont):
+                        child.pacman_cont = mutant_pacman_cont
+                        break
 
-                # Remove traces of previous subtree
-                nullify(child.pacman_cont.state_evaluator, mutation_node)
+                    self.num_tree_limit_violations += 1
 
-                # Grow a new subtree
-                child.pacman_cont.grow(mutation_node)
+                    if self.tree_limit_policy == 'truncate':
+                        mutant_pacman_cont.truncate(self.max_tree_height, self.max_tree_size)
+                        child.pacman_cont = mutant_pacman_cont
+                        break
+
+                # Note: if every attempt exceeded the tree limits, the mutation is rejected
+
+
+    def get_num_tree_limit_attempts(self):
+        """Returns the number of times crossover or mutation may be attempted
+        on a child before the operation is rejected for exceeding the tree limits.
+        """
+        if self.tree_limit_policy == 'retry':
+            return 1 + int(self.config.settings['max tree limit retries'])
+
+        return 1
+
+
+    def exceeds_tree_limits(self, pacman_cont):
+        """Returns True if the state evaluator of pacman_cont has more levels than
+        'max tree height' or more nodes than 'max tree size', False otherwise.
+        """
+        return pacman_cont.state_evaluator.get_height() > self.max_tree_height or pacman_cont.get_num_nodes() > self.max_tree_size
         
 
     def select_for_survival(self):
@@ -282,55 +548,25 @@ class GPDriver:
             self.population = selection_pool[:self.population_size]
         
 
-    def update_game_state(self, individual):
-        """Updates the state of the game *before* all characters have moved."""
-        if len(individual.world.fruit_coord):
-            fruit_coord = individual.world.fruit_coord
+    def replace_individual(self, child):
+        """Inserts the evaluated child into the population in place of a loser,
+        as steady-state runs do after each evaluation. The loser is found with
+        the survival selection configuration:
+            1. The least fit of k random individuals (k-tournament)
+            2. The least fit individual (truncation)
 
-        else:
-            fruit_coord = None
-
-        individual.game_state.update(individual.world.pacman_coords, individual.world.ghost_coords, individual.world.pill_coords, self.get_num_adj_walls(individual.world, individual.world.pacman_coords[0]), fruit_coord)
-
-
-    def move_units(self, individual):
-        """Moves all units in individual.world based on the unit controller moves.
-        
-        Before units are moved, a fruit probabilistically spawns and the game state
-        is updated.
-
-        After units are moved, game variables are updated.
+        With the plus survival strategy, the child only replaces a fitter loser.
         """
-        individual.world.randomly_spawn_fruit()
-
-        self.update_game_state(individual)
-
-        individual.world.move_pacman(individual.pacman_cont.get_move(individual.game_state))
-
-        for ghost_id in range(len(individual.world.ghost_coords)):
-            individual.world.move_ghost(ghost_id, individual.ghosts_cont.get_move(ghost_id, individual.game_state))
-
-        # Update time remaining
-        individual.world.time_remaining -= 1
-
-        for pacman_coord in individual.world.pacman_coords:
-            # Update pills
-            if pacman_coord in individual.world.pill_coords:
-                individual.world.pill_coords.remove(pacman_coord)
-                individual.world.num_pills_consumed += 1
+        if self.config.settings.getboolean('use k tournament survival selection'):
+            arena_indices = random.sample(range(len(self.population)), min(int(self.config.settings['k survival selection']), len(self.population)))
 
-            # Update fruit
-            if pacman_coord in individual.world.fruit_coord:
-                individual.world.fruit_coord.remove(pacman_coord)
-                individual.world.num_fruit_consumed += 1
+        else:
+            arena_indices = range(len(self.population))
 
-        # Update score
-        individual.world.update_score()
+        loser_index = min(arena_indices, key=lambda index : self.population[index].fitness)
 
-        # Update the world state
-        individual.world.world_file.save_snapshot(individual.world.pacman_coords,
-            individual.world.ghost_coords, individual.world.fruit_coord, 
-            individual.world.time_remaining, individual.world.score)
+        if self.config.settings.getboolean('comma survival strategy') or child.fitness >= self.population[loser_index].fitness:
+            self.population[loser_index] = child
 
 
     def decide_termination(self):
@@ -351,18 +587,6 @@ class GPDriver:
         return True
 
 
-    def check_game_over(self, individual):
-        """Returns False if the game is over for the given individual (allowing for a loop to terminate), 
-        and True otherwise.
-
-        The conditions for game over are seen in check_game_over() in the GPacWorld class.
-        """
-        if individual.world.check_game_over():
-            return False
-
-        return True
-
-
     def check_update_log_world_files(self):
         """Writes a new log file entry and writes a transcript of this run to the 
         world file iff it had the global best score.
@@ -382,6 +606,7 @@ class GPDriver:
 
         # Write log file row
         self.log.write_run_data(self.eval_count, self.avg_score, self.local_best_score)
+        self.write_tree_memory_stats()
         
         # Determine if a new global best score has been found
         if self.local_best_score > self.global_best_score:
@@ -404,9 +629,22 @@ class GPDriver:
             self.prev_avg_score = self.avg_score
 
 
-    def get_num_adj_walls(self, world, coord):
-        """Returns the number of walls adjacent to coord in the given world."""
-        return len([c for c in world.get_adj_coords(coord) if c in world.wall_coords])
+    def write_tree_memory_stats(self):
+        """Writes the node list sizes of the population's state evaluators, and
+        the number of tree limit violations since the last call, to the log file.
+        """
+        state_evaluators = [individual.pacman_cont.state_evaluator for individual in self.population]
+
+        # Note: node lists shared by copied state evaluators are only counted once
+        node_lists = {id(state_evaluator.list): state_evaluator for state_evaluator in state_evaluators}
+
+        self.log.write_tree_memory_stats(max(len(state_evaluator) for state_evaluator in state_evaluators),
+            max(state_evaluator.get_num_nodes() for state_evaluator in state_evaluators),
+            sum(len(state_evaluator) for state_evaluator in node_lists.values()),
+            sum(state_evaluator.get_num_nodes() for state_evaluator in node_lists.values()),
+            self.num_tree_limit_violations)
+
+        self.num_tree_limit_violations = 0
 
 
     def sort_individuals(self, individuals):
@@ -0,0 +1,198 @@
+import contextlib
+import gp.gp_driver as gp_driver_class
+import gp.run_pool as run_pool_class
+import io
+import multiprocessing
+import random
+import tempfile
+
+
+def get_island_seed(seed_val, run_count, island_index):
+    """Returns the seed of the random number generator of the given island
+    during the given run, derived from the experiment's seed value (see Seed).
+    """
+    return run_pool_class.get_run_seed(seed_val, run_count) + '/%i' % (island_index)
+
+
+def get_migration_targets(topology, source_island, islands, rand):
+    """Returns the islands receiving the emigrants of source_island, among the
+    (sorted) list islands, according to the given migration topology:
+        ring: the next island of the list, wrapping around
+        fully connected: every other island of the list
+        random: another island of the list, drawn with rand (a Random object)
+    """
+    other_islands = [island for island in islands if island != source_island]
+
+    if not other_islands:
+        return []
+
+    if topology == 'fully connected':
+        return other_islands
+
+    if topology == 'random':
+        return [rand.choice(other_islands)]
+
+    # Default to the ring topology
+    return [([island for island in other_islands if island > source_island] + other_islands)[0]]
+
+
+def play_island(connection, config, seed_val, run_count, island_index):
+    """Evolves one island's population for a run in its own process.
+
+    Where connection is the island's end of a Pipe to play_island_run().
+
+    The island is a GPDriver run with an equal share of the experiment's
+    fitness evaluations. Every 'migration interval' generations (or when it
+    terminates), the island sends its new log rows, whether it is still
+    running and the genomes of its 'num migrants' fittest individuals, then
+    receives the genomes of its immigrants (None once it must stop), whose
+    evaluation adds a log row. Finally,
+    it sends its screen output, best score and world and solution files
+    contents (see run_pool.play_run()).
+    """
+    random.seed(get_island_seed(seed_val, run_count, island_index))
+
+    # Note: island processes do not start evaluation pools of their own
+    config.settings['use evaluation pool'] = 'False'
+    config.settings['use remote evaluation'] = 'False'
+    config.settings['num fitness evals'] = str(int(config.settings['num fitness evals']) // int(config.settings['num islands']))
+
+    migration_interval = int(config.settings['migration interval'])
+    num_migrants = int(config.settings['num migrants'])
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        run_pool_class.redirect_output_files(config, output_dir)
+        screen_output = io.StringIO()
+
+        with contextlib.redirect_stdout(screen_output):
+            gp_driver = gp_driver_class.GPDriver(config)
+            gp_driver.run_count = run_count
+            gp_driver.begin_run()
+            gp_driver.evaluate(gp_driver.population)
+
+            # Log rows, as (eval count, average score, local best score) triplets
+            rows = [(gp_driver.eval_count, gp_driver.avg_score, gp_driver.local_best_score)]
+
+            while True:
+                is_running = True
+
+                for _ in range(migration_interval):
+                    if not gp_driver.decide_termination():
+                        is_running = False
+                        break
+
+                    gp_driver.step()
+                    rows.append((gp_driver.eval_count, gp_driver.avg_score, gp_driver.local_best_score))
+
+                connection.send((rows, is_running, gp_driver.get_emigrants(num_migrants)))
+                rows = []
+
+                immigrant_genomes = connection.recv()
+
+                if immigrant_genomes is None:
+                    break
+
+                gp_driver.immigrate(immigrant_genomes)
+                rows.append((gp_driver.eval_count, gp_driver.avg_score, gp_driver.local_best_score))
+
+            gp_driver.end_run()
+            gp_driver.close()
+
+        _, world_text, soln_text = run_pool_class.read_output_files(config)
+
+    connection.send((screen_output.getvalue(), gp_driver.global_best_score, world_text, soln_text))
+    connection.close()
+
+
+def recv_from_island(connections, processes, island):
+    """Returns the next message of the given island.
+
+    Raises RuntimeError, after terminating every island process, if the island
+    process exited without sending it (its traceback is printed on stderr).
+    """
+    try:
+        return connections[island].recv()
+
+    except EOFError:
+        for process in processes:
+            process.terminate()
+            process.join()
+
+        raise RuntimeError('island %i exited with code %s' % (island, processes[island].exitcode))
+
+
+def play_island_run(gp_driver):
+    """Performs the next run of the experiment of gp_driver (a GPDriver) as an
+    island model of 'num islands' populations, each evolved in its own process
+    (see play_island()).
+
+    Every 'migration interval' generations, the 'num migrants' fittest
+    individuals of each island replace the least fit individuals of the
+    islands it is connected to by the 'migration topology'. Each island's log
+    rows are written to gp_driver's log as comments, each followed by a row
+    for the islands as a whole, so the log keeps the format of a single
+    population run. The world and solution files are written whenever an
+    island beats the global best score.
+    """
+    config = gp_driver.config
+    num_islands = int(config.settings['num islands'])
+    topology = config.settings['migration topology']
+
+    # Note: the random topology draws from its own generator, derived like the islands' seeds
+    rand = random.Random(run_pool_class.get_run_seed(gp_driver.seed.val, gp_driver.run_count))
+
+    gp_driver.log.write_run_header(gp_driver.run_count)
+
+    connections = []
+    processes = []
+
+    for island_index in range(num_islands):
+        connection, island_connection = multiprocessing.Pipe()
+        process = multiprocessing.Process(target=play_island, args=(island_connection, config, gp_driver.seed.val, gp_driver.run_count, island_index))
+        process.start()
+
+        # Note: closing the parent's copy of the island's end lets recv() fail if the island dies
+        island_connection.close()
+
+        connections.append(connection)
+        processes.append(process)
+
+    running_islands = list(range(num_islands))
+    latest_rows = [None for _ in range(num_islands)]
+
+    while running_islands:
+        reports = {island: recv_from_island(connections, processes, island) for island in running_islands}
+
+        # Write the new rows generation by generation
+        for generation in range(max(len(rows) for rows, _, _ in reports.values())):
+            for island in running_islands:
+                rows = reports[island][0]
+
+                if generation < len(rows):
+                    latest_rows[island] = rows[generation]
+                    gp_driver.log.write_island_data(island, *rows[generation])
+
+            rows = [row for row in latest_rows if row]
+            gp_driver.log.write_run_data(sum(row[0] for row in rows), sum(row[1] for row in rows) / len(rows), max(row[2] for row in rows))
+
+        # Route the emigrants of every island to the islands still running
+        continuing_islands = [island for island in running_islands if reports[island][1]]
+        immigrant_genomes = {island: [] for island in continuing_islands}
+
+        for island in running_islands:
+            for target_island in get_migration_targets(topology, island, continuing_islands, rand):
+                immigrant_genomes[target_island] += reports[island][2]
+
+        for island in running_islands:
+            connections[island].send(immigrant_genomes.get(island))
+
+        running_islands = continuing_islands
+
+    for island in range(num_islands):
+        screen_output, best_score, world_text, soln_text = recv_from_island(connections, processes, island)
+        processes[island].join()
+
+        print(screen_output, end='')
+        run_pool_class.merge_best_output(gp_driver, best_score, world_text, soln_text)
+
+    gp_driver.run_count += 1
@@ -42,3 +42,79 @@ class Log:
         run_data = str(eval_count) + '\t' + str(average_score) + '\t' + str(highest_score)
         self.write(run_data)
         print(run_data)
+
+
+    def write_island_data(self, island_index, eval_count, average_score, highest_score):
+        """Writes the given run data of one island of an island model run to file.
+
+        Note: the line is written as a comment so log parsers can skip it.
+        """
+        island_data = '# Island %i: ' % (island_index) + str(eval_count) + '\t' + str(average_score) + '\t' + str(highest_score)
+        self.write(island_data)
+
+
+    def write_fitness_cache_stats(self, num_hits, num_lookups):
+        """Writes the given fitness cache hit counters to file and to the screen.
+
+        Note: the line is written as a comment so log parsers can skip it.
+        """
+        hit_rate = 100 * num_hits / num_lookups if num_lookups else 0
+        cache_stats = '# Fitness cache hits: %i / %i lookups (%.1f%%)' % (num_hits, num_lookups, hit_rate)
+        self.write(cache_stats)
+        print(cache_stats)
+
+
+    def write_tree_memory_stats(self, max_num_slots, max_num_nodes, total_num_slots, total_num_nodes, num_violations):
+        """Writes the given state evaluator memory usage to file: the largest number
+        of allocated node slots and of live nodes in any one tree, their totals over
+        the population and the number of tree limit violations.
+
+        Note: the line is written as a comment so log parsers can skip it.
+        """
+        memory_stats = '# Tree memory: peak %i slots / %i live nodes per tree, %i slots / %i live nodes in population, %i limit violations' % (
+            max_num_slots, max_num_nodes, total_num_slots, total_num_nodes, num_violations)
+        self.write(memory_stats)
+
+
+    def write_policy_table_stats(self, num_hits, num_lookups, num_entries, memory_size):
+        """Writes the given policy table hit counters, and the largest number of
+        entries and memory size (in bytes) of the policy tables of an evaluated
+        population, to file and to the screen.
+
+        Note: the line is written as a comment so log parsers can skip it.
+        """
+        hit_rate = 100 * num_hits / num_lookups if num_lookups else 0
+        table_stats = '# Policy table hits: %i / %i lookups (%.1f%%), peak %i entries (%.1f KiB)' % (num_hits, num_lookups, hit_rate, num_entries, memory_size / 1024)
+        self.write(table_stats)
+        print(table_stats)
+
+
+    def write_remote_worker_stats(self, address, num_jobs, busy_time, num_failures):
+        """Writes the given job count, busy time (the time spent playing games, in
+        seconds) and connection failure count of a remote evaluation worker to
+        file and to the screen.
+
+        Note: the line is written as a comment so log parsers can skip it.
+        """
+        throughput = num_jobs / busy_time if busy_time else 0
+        worker_stats = '# Remote worker %s: %i jobs in %.1f s (%.1f jobs/s), %i failures' % (address, num_jobs, busy_time, throughput, num_failures)
+        self.write(worker_stats)
+        print(worker_stats)
+
+
+    def write_worker_utilization_stats(self, num_workers, busy_time, wall_time):
+        """Writes the share of the given wall time (in seconds) that num_workers
+        evaluation workers spent playing games (busy_time, in seconds, summed over
+        the workers) to file and to the screen.
+
+        Note: the line is written as a comment so log parsers can skip it.
+        """
+        utilization = 100 * busy_time / (num_workers * wall_time) if wall_time else 0
+        utilization_stats = '# Worker utilization: %.1f%% of %i workers over %.1f s' % (utilization, num_workers, wall_time)
+        self.write(utilization_stats)
+        print(utilization_stats)
+
+
+    def close(self):
+        """Closes the log file."""
+        self.file.close()
@@ -0,0 +1,101 @@
+import controllers.flat_tree as flat_tree_class
+import hashlib
+import random
+
+
+# Constant declarations
+PROBE_BANK_SEED = 0
+
+ARBITRARY_LARGE_NUMBER = 99999
+
+FINGERPRINT_SIZE = 16
+
+
+class ProbeBank:
+    def __init__(self, config):
+        """Initializes the ProbeBank class.
+
+        Where config is a Config object.
+
+        A ProbeBank is a fixed set of 'num fingerprint probes' sampled decision
+        situations. Each situation holds one feature matrix row (see
+        PacmanController.get_features()) per candidate move of a pacman, the
+        first candidate always being to stay put. The rows of neighbouring moves
+        differ by at most one step in each distance, as they do in a real world.
+
+        The bank is generated from its own random number generator, so building
+        it does not disturb the random stream of the GP.
+        """
+        self.config = config
+
+        self.num_probes = int(self.config.settings['num fingerprint probes'])
+        self.max_distance = int(self.config.settings['width']) + int(self.config.settings['height'])
+
+        # self.features holds the rows of every situation, one after the other,
+        # and self.situation_sizes[i] is the number of rows of situation i
+        self.features = []
+        self.situation_sizes = []
+
+        rand = random.Random(PROBE_BANK_SEED)
+
+        for _ in range(self.num_probes):
+            num_moves = rand.randint(1, 5)
+            num_adj_walls = rand.randint(0, 5 - num_moves)
+            has_fruit = rand.random() < 0.5
+
+            distances = [rand.randint(1, self.max_distance) for _ in range(3)]
+            maze_detours = [rand.randint(0, self.max_distance // 2) for _ in range(3)]
+
+            for move in range(num_moves):
+                if move:
+                    # Moving changes each distance by at most one step
+                    move_distances = [max(0, distance + rand.randint(-1, 1)) for distance in distances]
+
+                else:
+                    move_distances = distances
+
+                maze_distances = [distance + detour for distance, detour in zip(move_distances, maze_detours)]
+
+                if not has_fruit:
+                    move_distances[2] = ARBITRARY_LARGE_NUMBER
+                    maze_distances[2] = ARBITRARY_LARGE_NUMBER
+
+                self.features.append(tuple(move_distances) + (num_adj_walls,) + tuple(maze_distances))
+
+            self.situation_sizes.append(num_moves)
+
+
+    def get_fingerprint(self, pacman_cont):
+        """Returns a behavioral fingerprint (bytes) of the state evaluator of the
+        given PacmanController.
+
+        The fingerprint is a hash of the move chosen (as in PacmanController.get_move())
+        in every situation of the bank, so state evaluators inducing the same
+        policy on the bank share it, however different their trees are.
+
+        State evaluators using RANDOM_FLOAT have no fixed policy (and rating the
+        bank would consume random numbers), so None is returned for them.
+        """
+        if flat_tree_class.RANDOM_FLOAT in pacman_cont.get_flat_state_evaluator().opcodes:
+            return None
+
+        # Note: the bank's synthetic rows are kept out of the controller's policy table
+        eval_results = pacman_cont.get_state_evaluator_function()(self.features)
+
+        decisions = bytearray()
+        eval_index = 0
+
+        for situation_size in self.situation_sizes:
+            best_eval_result = -1 * ARBITRARY_LARGE_NUMBER
+            best_move = 0
+
+            for move in range(situation_size):
+                if eval_results[eval_index] > best_eval_result:
+                    best_eval_result = eval_results[eval_index]
+                    best_move = move
+
+                eval_index += 1
+
+            decisions.append(best_move)
+
+        return hashlib.blake2b(bytes(decisions), digest_size=FINGERPRINT_SIZE).digest()
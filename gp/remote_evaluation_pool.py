@@ -0,0 +1,240 @@
+import collections
+import gp.evaluation_pool as evaluation_pool_class
+import gp.game_runner as game_runner_class
+import gp.worker_daemon as worker_daemon_class
+import multiprocessing
+import os
+import random
+import socket
+import threading
+
+
+# Note: local worker daemons listen on an ephemeral port
+LOCAL_WORKER_ADDRESS = 'localhost:0'
+
+
+class RemoteWorker:
+    def __init__(self, address, timeout=None):
+        """Initializes the RemoteWorker class.
+
+        A RemoteWorker is the driver's connection to the worker daemon listening
+        on address (see worker_daemon.parse_address()), along with the number of
+        jobs it completed, the time it reported playing them and the number of
+        times the connection was lost since its counters were last reset.
+
+        Socket operations taking longer than timeout seconds (if not None) fail,
+        so a hung worker is treated as lost.
+        """
+        self.address = address
+        self.timeout = timeout
+        self.sock = None
+
+        self.num_jobs = 0
+        self.busy_time = 0
+        self.num_failures = 0
+
+
+    def connect(self):
+        """Connects to the worker daemon, returning True if it is reachable."""
+        family, socket_address = worker_daemon_class.parse_address(self.address)
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+
+        try:
+            sock.connect(socket_address)
+
+        except OSError:
+            sock.close()
+            return False
+
+        self.sock = sock
+
+        return True
+
+
+    def disconnect(self):
+        """Closes the connection to the worker daemon (if any)."""
+        if self.sock:
+            self.sock.close()
+            self.sock = None
+
+
+    def reset_counters(self):
+        """Resets the job, busy time and failure counters of this worker."""
+        self.num_jobs = 0
+        self.busy_time = 0
+        self.num_failures = 0
+
+
+class RemoteEvaluationPool:
+    def __init__(self, config):
+        """Initializes the RemoteEvaluationPool class.
+
+        Where config is a Config object.
+
+        The pool farms games out to the worker daemons listed in 'evaluation
+        worker addresses' (comma-separated, see worker_daemon.parse_address()).
+        If none are listed, 'num evaluation workers' daemons (one per CPU if 0)
+        are spawned on localhost for the whole experiment.
+
+        Like an EvaluationPool, each game is shipped as the FlatTree genome of
+        its state evaluator and a world seed drawn from the GP's random stream
+        in population order, so the results of a given seed do not depend on
+        the number or speed of the workers. Up to 'remote evaluation pipeline
+        depth' jobs are in flight on each connection, and the jobs of a lost
+        worker are handed to the others, up to 'max remote evaluation retries'
+        times per job. A worker which does not answer within 'remote evaluation
+        timeout' seconds (if not 0) is considered lost.
+        """
+        self.config = config
+
+        self.save_transcripts = self.config.settings.getboolean('evaluation pool transcripts')
+        self.pipeline_depth = int(self.config.settings['remote evaluation pipeline depth'])
+        self.max_retries = int(self.config.settings['max remote evaluation retries'])
+        self.timeout = float(self.config.settings['remote evaluation timeout']) or None
+        self.config_hash = worker_daemon_class.get_config_hash(self.config)
+
+        # Used to replay games whose transcripts were not returned
+        self.game_runner = game_runner_class.GameRunner(self.config)
+
+        addresses = [address.strip() for address in self.config.settings['evaluation worker addresses'].split(',') if address.strip()]
+        self.local_processes = []
+
+        if not addresses:
+            addresses = self.spawn_local_workers(int(self.config.settings['num evaluation workers']) or os.cpu_count())
+
+        self.workers = [RemoteWorker(address, self.timeout) for address in addresses]
+
+        for worker in self.workers:
+            worker.connect()
+
+
+    def spawn_local_workers(self, num_workers):
+        """Starts num_workers worker daemons on localhost, returning their addresses."""
+        addresses = []
+
+        for _ in range(num_workers):
+            connection, daemon_connection = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=worker_daemon_class.serve, args=(self.config, LOCAL_WORKER_ADDRESS, daemon_connection), daemon=True)
+            process.start()
+
+            addresses.append(connection.recv())
+            self.local_processes.append(process)
+
+        return addresses
+
+
+    def play_games(self, population):
+        """Plays the game of every individual in population on the workers,
+        replacing the world of each individual by a GameRecord of its game.
+
+        Raises ConnectionError if no worker can be reached, and RuntimeError if
+        a job exhausts its retries, a worker rejects a job or a worker sends a
+        malformed result.
+        """
+        tasks = []
+
+        for individual in population:
+            flat_state_evaluator = individual.pacman_cont.get_flat_state_evaluator()
+            tasks.append((flat_state_evaluator.opcodes, flat_state_evaluator.constants, random.getrandbits(evaluation_pool_class.SEED_BITS)))
+
+        self.results = [None for _ in tasks]
+        self.num_attempts = [0 for _ in tasks]
+        self.pending_jobs = collections.deque(range(len(tasks)))
+        self.errors = []
+        self.lock = threading.Lock()
+
+        # Note: jobs requeued by a lost worker after the others have finished are
+        # dispatched in another round, reconnecting to lost workers first
+        while self.pending_jobs:
+            workers = [worker for worker in self.workers if worker.sock or worker.connect()]
+
+            if not workers:
+                raise ConnectionError('no evaluation worker is reachable')
+
+            threads = [threading.Thread(target=self.run_worker, args=(worker, tasks)) for worker in workers]
+
+            for thread in threads:
+                thread.start()
+
+            for thread in threads:
+                thread.join()
+
+            if self.errors:
+                # Note: connections may be left with unread results
+                for worker in self.workers:
+                    worker.disconnect()
+
+                raise RuntimeError(self.errors[0])
+
+        for individual, (opcodes, constants, seed), (score, transcript) in zip(population, tasks, self.results):
+            individual.world = evaluation_pool_class.GameRecord(self.game_runner, opcodes, constants, seed, score, transcript)
+
+
+    def run_worker(self, worker, tasks):
+        """Feeds pending jobs of tasks to worker, keeping up to pipeline_depth
+        jobs in flight, until no job is left (run in a thread per worker).
+
+        If the connection is lost (or times out), the jobs in flight are
+        requeued. Malformed results are reported as errors.
+        """
+        in_flight_jobs = collections.deque()
+
+        try:
+            while not self.errors:
+                while len(in_flight_jobs) < self.pipeline_depth:
+                    with self.lock:
+                        if not self.pending_jobs:
+                            break
+
+                        job_id = self.pending_jobs.popleft()
+                        self.num_attempts[job_id] += 1
+
+                    in_flight_jobs.append(job_id)
+
+                    opcodes, constants, seed = tasks[job_id]
+                    worker_daemon_class.send_job(worker.sock, job_id, opcodes, constants, seed, self.config_hash, self.save_transcripts)
+
+                if not in_flight_jobs:
+                    break
+
+                # Note: a worker plays the jobs of a connection in order
+                result = worker_daemon_class.recv_result(worker.sock)
+                job_id = in_flight_jobs.popleft()
+
+                if 'error' in result:
+                    self.errors.append('evaluation worker %s: %s' % (worker.address, result['error']))
+                    break
+
+                if result['job id'] != job_id:
+                    raise ValueError('result of job %r received for job %i' % (result['job id'], job_id))
+
+                self.results[job_id] = (result['score'], result['transcript'])
+                worker.num_jobs += 1
+                worker.busy_time += result['play time']
+
+        except OSError:
+            worker.num_failures += 1
+            worker.disconnect()
+
+            with self.lock:
+                for job_id in in_flight_jobs:
+                    if self.num_attempts[job_id] > self.max_retries:
+                        self.errors.append('evaluation job %i failed %i times' % (job_id, self.num_attempts[job_id]))
+
+                    self.pending_jobs.append(job_id)
+
+        except (ValueError, KeyError, TypeError) as error:
+            # Note: the connection cannot be trusted to be in sync anymore
+            worker.disconnect()
+            self.errors.append('evaluation worker %s: malformed result (%r)' % (worker.address, error))
+
+
+    def close(self):
+        """Disconnects from the workers and shuts the local worker daemons (if any) down."""
+        for worker in self.workers:
+            worker.disconnect()
+
+        for process in self.local_processes:
+            process.terminate()
+            process.join()
@@ -0,0 +1,115 @@
+import contextlib
+import gp.gp_driver as gp_driver_class
+import io
+import multiprocessing
+import os
+import random
+import tempfile
+
+
+# Constant declarations
+# Note: a log file holds the config parameters up to this line, followed by the runs
+LOG_HEADER_END = 'Result Log\n'
+
+OUTPUT_FILE_PATH_KEYS = ['log file path', 'world file path', 'soln file path']
+
+
+def get_run_seed(seed_val, run_count):
+    """Returns the seed of the random number generator for the given run,
+    derived from the experiment's seed value (see Seed).
+    """
+    return '%r/%i' % (seed_val, run_count)
+
+
+def redirect_output_files(config, output_dir):
+    """Points the log, world and solution file paths of config into output_dir."""
+    for key in OUTPUT_FILE_PATH_KEYS:
+        config.settings[key] = os.path.join(output_dir, os.path.basename(config.settings[key]))
+
+
+def read_output_files(config):
+    """Returns the contents of the log, world and solution files of config,
+    the log being stripped of its config parameters. None is returned in place
+    of files which were not written.
+    """
+    output_texts = []
+
+    for key in OUTPUT_FILE_PATH_KEYS:
+        if os.path.exists(config.settings[key]):
+            with open(config.settings[key], 'r') as file:
+                output_texts.append(file.read())
+
+        else:
+            output_texts.append(None)
+
+    if output_texts[0] is not None:
+        output_texts[0] = output_texts[0][output_texts[0].index(LOG_HEADER_END) + len(LOG_HEADER_END):]
+
+    return output_texts
+
+
+def merge_best_output(gp_driver, best_score, world_text, soln_text):
+    """Writes the given world and solution files contents to the files of
+    gp_driver (a GPDriver) if best_score beats its global best score.
+    """
+    if best_score > gp_driver.global_best_score:
+        gp_driver.global_best_score = best_score
+
+        for key, text in (('world file path', world_text), ('soln file path', soln_text)):
+            if text is not None:
+                with open(gp_driver.config.settings[key], 'w') as file:
+                    file.write(text)
+
+
+def play_run(task):
+    """Performs the run described by task (see play_runs()) in a worker process.
+
+    The run writes its log, world and solution files into a temporary directory
+    and its screen output into a buffer. Returns the screen output, the runs
+    part of the log, the best score of the run and the contents of the world
+    and solution files of its best individual (None if they were not written).
+    """
+    config, seed_val, run_count = task
+
+    random.seed(get_run_seed(seed_val, run_count))
+
+    # Note: worker processes cannot start evaluation pools of their own
+    config.settings['use evaluation pool'] = 'False'
+    config.settings['use remote evaluation'] = 'False'
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        redirect_output_files(config, output_dir)
+        screen_output = io.StringIO()
+
+        with contextlib.redirect_stdout(screen_output):
+            gp_driver = gp_driver_class.GPDriver(config)
+            gp_driver.run_count = run_count
+            gp_driver.run()
+            gp_driver.close()
+
+        log_text, world_text, soln_text = read_output_files(config)
+
+    return screen_output.getvalue(), log_text, gp_driver.global_best_score, world_text, soln_text
+
+
+def play_runs(gp_driver):
+    """Performs the remaining runs of the experiment of gp_driver (a GPDriver)
+    in 'num parallel runs' worker processes at a time.
+
+    Each run seeds its random number generator with a seed derived from the
+    experiment's seed and its run count. The runs are merged in run order as
+    they complete: their screen output is printed, their log entries are
+    appended to gp_driver's log, and the world and solution files are written
+    whenever a run beats the global best score, just as if the runs had been
+    performed one after the other by gp_driver.
+    """
+    config = gp_driver.config
+    tasks = [(config, gp_driver.seed.val, run_count) for run_count in range(gp_driver.run_count, int(config.settings['num experiment runs']) + 1)]
+
+    with multiprocessing.Pool(int(config.settings['num parallel runs'])) as pool:
+        for screen_output, log_text, best_score, world_text, soln_text in pool.imap(play_run, tasks):
+            print(screen_output, end='')
+            gp_driver.log.write(log_text.rstrip('\n'))
+            merge_best_output(gp_driver, best_score, world_text, soln_text)
+
+            gp_driver.run_count += 1
@@ -0,0 +1,157 @@
+import asyncio
+import concurrent.futures
+import gp.evaluation_pool as evaluation_pool_class
+import gp.game_runner as game_runner_class
+import os
+import random
+import sys
+import time
+
+
+def play_timed_game(task):
+    """Plays the game described by task (see evaluation_pool.play_game()) in a
+    worker process, returning its score, its transcript (or None) and the time
+    spent playing it, in seconds.
+    """
+    start_time = time.time()
+    score, transcript = evaluation_pool_class.play_game(task)
+
+    return score, transcript, time.time() - start_time
+
+
+async def play_steady_state_run(gp_driver, executor, num_workers):
+    """Performs the next run of gp_driver (a GPDriver) as a steady-state GP on
+    an asyncio event loop, playing games on executor's num_workers processes.
+
+    The initial population is evaluated as a batch. From then on, as soon as
+    any game finishes, its individual replaces a loser of the population (see
+    GPDriver.replace_individual()) and a new child is bred and dispatched, so
+    workers never wait for the slowest game of a generation. A log row is
+    written (and bloat is controlled) every lambda evaluations, as if they
+    were a generation. When bloat is controlled, each child is penalized
+    before it competes with the (penalized) population.
+
+    If a fitness cache is configured, children whose genotype has already
+    been played enough games reuse its fitness instead of being dispatched.
+
+    Note: individuals are inserted in the order their games finish, so unlike
+    generational runs, the results of a given seed depend on game timings.
+    """
+    loop = asyncio.get_running_loop()
+
+    save_transcripts = gp_driver.config.settings.getboolean('evaluation pool transcripts')
+    num_fitness_evals = int(gp_driver.config.settings['num fitness evals'])
+
+    # Note: by default, a job is kept queued for every worker to pick up as soon as it finishes its game
+    max_num_in_flight = int(gp_driver.config.settings['steady state evaluations in flight']) or 2 * num_workers
+
+    # Used to replay games whose transcripts were not returned
+    game_runner = game_runner_class.GameRunner(gp_driver.config)
+
+    fitness_cache = gp_driver.fitness_cache
+    control_bloat = gp_driver.config.settings.getboolean('control bloat')
+
+    # Individuals whose games are in flight, with their tasks, by future
+    in_flight = {}
+
+    def dispatch(individual):
+        flat_state_evaluator = individual.pacman_cont.get_flat_state_evaluator()
+        task = (flat_state_evaluator.opcodes, flat_state_evaluator.constants, random.getrandbits(evaluation_pool_class.SEED_BITS), save_transcripts)
+        in_flight[loop.run_in_executor(executor, play_timed_game, task)] = (individual, task)
+
+
+    def collect(future):
+        individual, (opcodes, constants, seed, _) = in_flight.pop(future)
+        score, transcript, game_time = future.result()
+        individual.world = evaluation_pool_class.GameRecord(game_runner, opcodes, constants, seed, score, transcript)
+        gp_driver.end_eval(individual)
+
+        if fitness_cache:
+            fitness_cache.add_sample(individual)
+
+        return individual, game_time
+
+
+    def insert(individual):
+        nonlocal logged_eval_count
+
+        if control_bloat:
+            gp_driver.apply_parsimony_pressure(individual, gp_driver.get_avg_num_nodes())
+
+        gp_driver.replace_individual(individual)
+
+        if gp_driver.eval_count - logged_eval_count >= gp_driver.child_population_size:
+            gp_driver.check_update_log_world_files()
+            logged_eval_count = gp_driver.eval_count
+
+            if control_bloat:
+                gp_driver.control_bloat()
+
+
+    gp_driver.begin_run()
+    start_time = time.time()
+    busy_time = 0
+
+    for individual in gp_driver.population:
+        dispatch(individual)
+
+    futures = list(in_flight)
+    await asyncio.wait(futures)
+
+    for future in futures:
+        _, game_time = collect(future)
+        busy_time += game_time
+
+    gp_driver.check_update_log_world_files()
+    logged_eval_count = gp_driver.eval_count
+
+    while True:
+        while gp_driver.decide_termination() and gp_driver.eval_count + len(in_flight) < num_fitness_evals and len(in_flight) < max_num_in_flight:
+            gp_driver.select_parents()
+            gp_driver.recombine(1)
+            gp_driver.mutate()
+            child = gp_driver.children[0]
+
+            if fitness_cache and fitness_cache.partition([child])[1] and fitness_cache.reuse(child):
+                gp_driver.eval_count += 1
+                insert(child)
+
+            else:
+                dispatch(child)
+
+        if not in_flight:
+            break
+
+        done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+
+        # Note: games finished together are collected in dispatch order
+        for future in [future for future in in_flight if future in done]:
+            individual, game_time = collect(future)
+            busy_time += game_time
+            insert(individual)
+
+    if gp_driver.eval_count > logged_eval_count:
+        gp_driver.check_update_log_world_files()
+
+    gp_driver.log.write_worker_utilization_stats(num_workers, busy_time, time.time() - start_time)
+    gp_driver.end_run()
+
+
+def play_steady_state_runs(gp_driver):
+    """Performs the remaining runs of the experiment of gp_driver (a GPDriver)
+    as steady-state runs (see play_steady_state_run()) on a pool of 'num
+    evaluation workers' worker processes (one per CPU if 0), kept alive for the
+    whole experiment.
+
+    Note: policy tables are still used by the workers, but their statistics
+    stay in the workers, so they are not logged.
+    """
+    config = gp_driver.config
+    num_workers = int(config.settings['num evaluation workers']) or os.cpu_count()
+
+    if gp_driver.use_policy_tables:
+        print('Warning: policy table statistics are not collected in steady-state runs', file=sys.stderr)
+
+    with concurrent.futures.ProcessPoolExecutor(num_workers, initializer=evaluation_pool_class.init_worker, initargs=(config,)) as executor:
+        while gp_driver.run_count <= int(config.settings['num experiment runs']):
+            asyncio.run(play_steady_state_run(gp_driver, executor, num_workers))
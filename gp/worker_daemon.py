@@ -0,0 +1,197 @@
+import array
+import controllers.flat_tree as flat_tree_class
+import gp.game_runner as game_runner_class
+import hashlib
+import json
+import socket
+import socketserver
+import struct
+import time
+
+
+# Constant declarations
+# Note: every frame of the protocol is its byte length, as a big-endian unsigned
+# 32 bit integer, followed by its bytes
+FRAME_LENGTH_FORMAT = '!I'
+FRAME_LENGTH_SIZE = struct.calcsize(FRAME_LENGTH_FORMAT)
+
+UNIX_ADDRESS_PREFIX = 'unix:'
+
+# Settings which affect the games played by a worker, so a driver and its workers
+# must agree on them (see get_config_hash())
+# Note: the seed settings are left out, as every job carries its world seed
+HASHED_KEYS = ['width', 'height', 'pill density', 'wall density', 'num pacmen', 'num ghosts',
+    'num wall carvers', 'num respawn wall carvers', 'max wall carver travel distance', 'min wall carver travel distance',
+    'fruit spawn probability', 'fruit score', 'time multiplier', 'max fp constant',
+    'use maze distance terminals', 'use state evaluator compilation', 'use policy tables', 'policy table size']
+
+
+def get_config_hash(config):
+    """Returns the hex SHA-256 digest of the settings of config which affect
+    the games played by a worker, so drivers only send jobs to workers which
+    would play the same games as themselves.
+    """
+    settings = [(key, config.settings.get(key)) for key in HASHED_KEYS]
+
+    return hashlib.sha256(json.dumps(settings).encode()).hexdigest()
+
+
+def parse_address(address):
+    """Returns the socket family and address of the given address string:
+    either 'unix:<path>' for a Unix socket or '<host>:<port>' for a TCP socket.
+    """
+    if address.startswith(UNIX_ADDRESS_PREFIX):
+        return socket.AF_UNIX, address[len(UNIX_ADDRESS_PREFIX):]
+
+    host, port = address.rsplit(':', 1)
+
+    return socket.AF_INET, (host, int(port))
+
+
+def send_frames(sock, frames):
+    """Sends the given frames (bytes objects) on sock, length-prefixed."""
+    sock.sendall(b''.join(struct.pack(FRAME_LENGTH_FORMAT, len(frame)) + frame for frame in frames))
+
+
+def recv_exactly(sock, num_bytes):
+    """Returns exactly num_bytes bytes received on sock.
+
+    Raises ConnectionError if the peer closes the connection first.
+    """
+    chunks = []
+
+    while num_bytes:
+        chunk = sock.recv(num_bytes)
+
+        if not chunk:
+            raise ConnectionError('connection closed by peer')
+
+        chunks.append(chunk)
+        num_bytes -= len(chunk)
+
+    return b''.join(chunks)
+
+
+def recv_frame(sock):
+    """Returns the next frame received on sock."""
+    frame_length, = struct.unpack(FRAME_LENGTH_FORMAT, recv_exactly(sock, FRAME_LENGTH_SIZE))
+
+    return recv_exactly(sock, frame_length)
+
+
+def send_job(sock, job_id, opcodes, constants, seed, config_hash, save_transcript):
+    """Sends a job to a worker: a JSON header frame followed by the opcodes and
+    constants frames of the FlatTree genome to play.
+
+    Note: constants are sent in native byte order, so a driver and its workers
+    must share the same endianness.
+    """
+    header = {'job id' : job_id, 'seed' : seed, 'config hash' : config_hash, 'save transcript' : save_transcript}
+    send_frames(sock, [json.dumps(header).encode(), opcodes.tobytes(), constants.tobytes()])
+
+
+def recv_job(sock):
+    """Returns the next job received from a driver (see send_job()), as its
+    header and its opcodes and constants arrays.
+    """
+    header = json.loads(recv_frame(sock).decode())
+
+    opcodes = array.array(flat_tree_class.OPCODE_TYPECODE)
+    opcodes.frombytes(recv_frame(sock))
+
+    constants = array.array(flat_tree_class.CONSTANT_TYPECODE)
+    constants.frombytes(recv_frame(sock))
+
+    return header, opcodes, constants
+
+
+def send_result(sock, result):
+    """Sends a job result (a dict holding the job id and either the score,
+    transcript and play time of its game or an error message) to a driver.
+    """
+    send_frames(sock, [json.dumps(result).encode()])
+
+
+def recv_result(sock):
+    """Returns the next job result received from a worker (see send_result())."""
+    return json.loads(recv_frame(sock).decode())
+
+
+class EvaluationRequestHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        """Plays the jobs of a driver connection until the driver disconnects.
+
+        Jobs are played in the order they are received, so drivers may pipeline
+        several jobs on a connection.
+        """
+        game_runner = game_runner_class.GameRunner(self.server.config)
+        config_hash = get_config_hash(self.server.config)
+
+        while True:
+            try:
+                header, opcodes, constants = recv_job(self.request)
+
+            except ConnectionError:
+                return
+
+            if header['config hash'] != config_hash:
+                send_result(self.request, {'job id' : header['job id'], 'error' : 'config hash mismatch'})
+                continue
+
+            start_time = time.time()
+            world = game_runner.play_seeded_game(opcodes, constants, header['seed'])
+            play_time = time.time() - start_time
+
+            transcript = world.world_file.file_str if header['save transcript'] else None
+
+            send_result(self.request, {'job id' : header['job id'], 'score' : world.score, 'transcript' : transcript, 'play time' : play_time})
+
+
+class ForkingTCPWorkerServer(socketserver.ForkingMixIn, socketserver.TCPServer):
+    # Note: each driver connection is served by its own process, as games seed
+    # the random module's global generator
+    allow_reuse_address = True
+
+
+class ForkingUnixWorkerServer(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+    pass
+
+
+def create_server(config, address):
+    """Returns a worker daemon server listening on the given address string
+    (see parse_address()) and playing games with config (a Config object).
+
+    A TCP port of 0 binds an ephemeral port, which can be read back from the
+    server's server_address attribute.
+    """
+    family, socket_address = parse_address(address)
+
+    if family == socket.AF_UNIX:
+        server = ForkingUnixWorkerServer(socket_address, EvaluationRequestHandler)
+
+    else:
+        server = ForkingTCPWorkerServer(socket_address, EvaluationRequestHandler)
+
+    server.config = config
+
+    return server
+
+
+def serve(config, address, connection=None):
+    """Runs a worker daemon on the given address string until it is killed.
+
+    If connection (one end of a Pipe) is given, the address the daemon is
+    listening on is sent through it once the daemon is ready.
+    """
+    server = create_server(config, address)
+
+    if connection:
+        if isinstance(server.server_address, tuple):
+            connection.send('%s:%i' % server.server_address[:2])
+
+        else:
+            connection.send(UNIX_ADDRESS_PREFIX + server.server_address)
+
+        connection.close()
+
+    server.serve_forever()
@@ -1,6 +1,10 @@
 #!/usr/bin/env python3
 
 import gp.gp_driver as gp_driver_class
+import gp.island_model as island_model_class
+import gp.run_pool as run_pool_class
+import gp.steady_state as steady_state_class
+import sys
 import util.args as args_class
 import util.config as config_class
 
@@ -15,28 +19,42 @@ if __name__ == '__main__':
     config = config_class.Config(config_file)
 
 
-    # Initialize the GP driver and its run variables
-    gp_driver = gp_driver_class.GPDriver(config)
+    # Warn about settings overridden by the selected way of running the GP
+    # Note: steady state takes precedence over islands, which take precedence over parallel runs
+    run_modes = [mode for mode, is_used in [('use steady state', config.settings.getboolean('use steady state')),
+        ('num islands', int(config.settings['num islands']) > 1),
+        ('num parallel runs', int(config.settings['num parallel runs']) > 1)] if is_used]
 
+    for mode in run_modes[1:]:
+        print('Warning: \'%s\' is ignored, as \'%s\' is set' % (mode, run_modes[0]), file=sys.stderr)
 
-    # Run the GP
-    while gp_driver.run_count <= int(config.settings['num experiment runs']):
-        gp_driver.begin_run()
+    evaluation_modes = [mode for mode in ['use remote evaluation', 'use evaluation pool'] if config.settings.getboolean(mode)]
+
+    if run_modes:
+        for mode in evaluation_modes:
+            print('Warning: \'%s\' is ignored, as \'%s\' is set' % (mode, run_modes[0]), file=sys.stderr)
 
-        gp_driver.evaluate(gp_driver.population)
+    elif len(evaluation_modes) > 1:
+        print('Warning: \'use evaluation pool\' is ignored, as \'use remote evaluation\' is set', file=sys.stderr)
 
-        while gp_driver.decide_termination():
-            if config.settings.getboolean('control bloat'):
-                gp_driver.control_bloat()
 
-            gp_driver.select_parents()
+    # Initialize the GP driver and its run variables
+    gp_driver = gp_driver_class.GPDriver(config)
 
-            gp_driver.recombine()
 
-            gp_driver.mutate()
+    # Run the GP
+    if config.settings.getboolean('use steady state'):
+        steady_state_class.play_steady_state_runs(gp_driver)
+
+    elif int(config.settings['num islands']) > 1:
+        while gp_driver.run_count <= int(config.settings['num experiment runs']):
+            island_model_class.play_island_run(gp_driver)
 
-            gp_driver.evaluate(gp_driver.children)
+    elif int(config.settings['num parallel runs']) > 1:
+        run_pool_class.play_runs(gp_driver)
 
-            gp_driver.select_for_survival()
+    else:
+        while gp_driver.run_count <= int(config.settings['num experiment runs']):
+            gp_driver.run()
 
-        gp_driver.end_run()
+    gp_driver.close()
@@ -1,4 +1,18 @@
+# Shared CoordinateTable objects, keyed by world dimensions
+coordinate_tables = {}
+
+
+def get_coordinate_table(width, height):
+    """Returns the (shared) CoordinateTable for a world of the given dimensions."""
+    if not (width, height) in coordinate_tables:
+        coordinate_tables[(width, height)] = CoordinateTable(width, height)
+
+    return coordinate_tables[(width, height)]
+
+
 class Coordinate:
+    __slots__ = ('x', 'y')
+
     def __init__(self, x, y):
         """Initializes the Coordinate class."""
         self.x = x
@@ -46,3 +60,27 @@ class Coordinate:
         """Returns a hash representation of a coordinate."""
         return (self.x + 1) * 100000 + self.y
 
+
+class CoordinateTable:
+    def __init__(self, width, height):
+        """Initializes the CoordinateTable class.
+
+        A CoordinateTable interns one Coordinate object per cell of a world (where
+        the cell of coordinate (x, y) is the integer y * width + x), so positions
+        can be looked up instead of allocated. Interned coordinates are shared and
+        must never be modified in place.
+        """
+        self.width = width
+        self.height = height
+
+        self.coords = [Coordinate(cell % self.width, cell // self.width) for cell in range(self.width * self.height)]
+
+
+    def get(self, x, y):
+        """Returns the interned Coordinate object of (x, y)."""
+        return self.coords[y * self.width + x]
+
+
+    def get_cell(self, coord):
+        """Returns the cell of the given coordinate."""
+        return coord.y * self.width + coord.x
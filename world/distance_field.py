@@ -0,0 +1,101 @@
+import collections
+
+
+# Constant declarations
+INFINITY = 1 << 30
+
+ARBITRARY_LARGE_NUMBER = 99999
+
+NO_CELL = -1
+
+
+class DistanceField:
+    def __init__(self, adj_cells, source_cells):
+        """Initializes the DistanceField class.
+
+        Where adj_cells[cell] lists the cells adjacent to cell in the graph the
+        distances are measured in (e.g. all neighbouring cells for Manhattan
+        distances, or only open neighbouring cells for maze distances), and
+        source_cells is an iterable of the cells holding the objects of interest.
+
+        The field stores, for every cell, the distance to its nearest source and
+        which source that is (found with a multi-source breadth-first search), so
+        the distance to the nearest source can be read in constant time. When a
+        source is removed, only the cells that were nearest to it are recomputed.
+        """
+        self.adj_cells = adj_cells
+        self.sources = set(source_cells)
+
+        self.distances = [INFINITY] * len(self.adj_cells)
+        self.nearest_sources = [NO_CELL] * len(self.adj_cells)
+
+        for cell in self.sources:
+            self.distances[cell] = 0
+            self.nearest_sources[cell] = cell
+
+        self.propagate({0: list(self.sources)})
+
+
+    def get_distance(self, cell):
+        """Returns the distance between cell and the nearest source.
+
+        If no source can be reached from cell, ARBITRARY_LARGE_NUMBER is returned.
+        """
+        if self.distances[cell] == INFINITY:
+            return ARBITRARY_LARGE_NUMBER
+
+        return self.distances[cell]
+
+
+    def remove_source(self, source_cell):
+        """Removes the source at source_cell and updates the affected distances."""
+        self.sources.remove(source_cell)
+
+        # Collect the (connected) region of cells whose nearest source was source_cell
+        region = [source_cell]
+        self.nearest_sources[source_cell] = NO_CELL
+
+        for cell in region:
+            self.distances[cell] = INFINITY
+
+            for adj_cell in self.adj_cells[cell]:
+                if self.nearest_sources[adj_cell] == source_cell:
+                    self.nearest_sources[adj_cell] = NO_CELL
+                    region.append(adj_cell)
+
+        # Seed the region with the distances offered by its unaffected boundary
+        buckets = collections.defaultdict(list)
+
+        for cell in region:
+            for adj_cell in self.adj_cells[cell]:
+                if self.nearest_sources[adj_cell] != NO_CELL and self.distances[adj_cell] + 1 < self.distances[cell]:
+                    self.distances[cell] = self.distances[adj_cell] + 1
+                    self.nearest_sources[cell] = self.nearest_sources[adj_cell]
+
+            if self.distances[cell] != INFINITY:
+                buckets[self.distances[cell]].append(cell)
+
+        self.propagate(buckets)
+
+
+    def propagate(self, buckets):
+        """Relaxes distances outwards from the cells in buckets (a dictionary of
+        distance to cells at that distance) in order of increasing distance.
+        """
+        while buckets:
+            distance = min(buckets)
+
+            for cell in buckets.pop(distance):
+                if self.distances[cell] != distance:
+                    # This cell has since been reached by a shorter path
+                    continue
+
+                for adj_cell in self.adj_cells[cell]:
+                    if self.distances[adj_cell] > distance + 1:
+                        self.distances[adj_cell] = distance + 1
+                        self.nearest_sources[adj_cell] = self.nearest_sources[cell]
+
+                        if not distance + 1 in buckets:
+                            buckets[distance + 1] = []
+
+                        buckets[distance + 1].append(adj_cell)
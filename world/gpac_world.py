@@ -3,7 +3,10 @@ import copy
 import gp.world_file as world_file_class
 import random
 import world.coordinate as coord_class
+import world.distance_field as distance_field_class
 import world.gpac_chars as chars
+import world.passability_grid as passability_grid_class
+import world.spatial_index as spatial_index_class
 import world.wall_carver as wall_carver_class
 
 
@@ -26,33 +29,37 @@ class GPacWorld:
         self.fruit_spawn_prob = float(self.config.settings['fruit spawn probability'])
         self.fruit_score = int(self.config.settings['fruit score'])
         self.time_multiplier = int(self.config.settings['time multiplier'])
+        self.use_maze_distance_terminals = self.config.settings.getboolean('use maze distance terminals')
+
+        # Get the interned coordinates of this world's cells
+        # Note: interned coordinates are shared and must never be modified in place
+        self.coordinate_table = coord_class.get_coordinate_table(self.width, self.height)
 
         # Create initial world attributes
-        self.pacman_coords= [coord_class.Coordinate(0, self.height - 1) for _ in range(self.num_pacmen)]
-        self.ghost_coords = [coord_class.Coordinate(self.width - 1, 0) for _ in range(self.num_ghosts)]
+        self.pacman_coords= [self.coordinate_table.get(0, self.height - 1) for _ in range(self.num_pacmen)]
+        self.ghost_coords = [self.coordinate_table.get(self.width - 1, 0) for _ in range(self.num_ghosts)]
         self.wall_coords = set([])
         self.pill_coords = set([])
         self.fruit_coord = set([])
+
+        # Cells of the pills and the fruit, kept in sync with pill_coords and fruit_coord
+        self.pill_cells = set([])
+        self.fruit_cell = passability_grid_class.NO_CELL
         self.time_remaining = self.time_multiplier * self.width * self.height
         self.total_time = self.time_remaining
         self.num_pills_consumed = 0
         self.num_fruit_consumed = 0
         self.score = 0
 
-        self.prev_pacman_coords = []
-        for pacman_coord in self.pacman_coords:
-            self.prev_pacman_coords.append(coord_class.Coordinate(pacman_coord.x, pacman_coord.y))
-
-        self.prev_ghost_coords = []
-        for ghost_coord in self.ghost_coords:
-            self.prev_ghost_coords.append(coord_class.Coordinate(ghost_coord.x, ghost_coord.y))
+        self.prev_pacman_coords = list(self.pacman_coords)
+        self.prev_ghost_coords = list(self.ghost_coords)
         
         # Create helper set of all coordinates
         self.all_coords = set([])
 
         for x in range(self.width):
             for y in range(self.height):
-                self.all_coords.add(coord_class.Coordinate(x, y))
+                self.all_coords.add(self.coordinate_table.get(x, y))
 
         # Place walls and pills in the world
         # Only do this if the world is not being created for the first time
@@ -60,6 +67,25 @@ class GPacWorld:
         if not initial_instance:
             self.generate_world()
 
+        # Create the grid used for constant time movement validity checks
+        self.passability_grid = passability_grid_class.PassabilityGrid(self.width, self.height, self.wall_coords, int(self.config.settings['maze distance cache rows']))
+
+        # Create the distance fields to the nearest pill, updated as pills are eaten
+        self.pill_distance_field = distance_field_class.DistanceField(self.passability_grid.adj_cells, self.pill_cells)
+
+        if self.use_maze_distance_terminals:
+            self.pill_maze_distance_field = distance_field_class.DistanceField(self.passability_grid.open_adj_cells, self.pill_cells)
+
+        else:
+            self.pill_maze_distance_field = None
+
+        # Create the spatial index of the ghosts (if there are enough of them), updated as they move
+        if self.num_ghosts >= spatial_index_class.MIN_INDEXED_OBJECTS:
+            self.ghost_index = spatial_index_class.SpatialIndex(self.width, self.height, [self.coordinate_table.get_cell(c) for c in self.ghost_coords])
+
+        else:
+            self.ghost_index = None
+
         # Create & write to world file
         self.world_file = world_file_class.WorldFile(self.config)
         self.world_file.save_first_snapshot(self.width, self.height, self.pacman_coords,
@@ -91,9 +117,7 @@ class GPacWorld:
             assign_unit_starting_coords(wall_carvers)
 
             # Get walls to carve
-            walls_to_carve = []
-            for coord in self.all_coords:
-                walls_to_carve.append(coord_class.Coordinate(coord.x, coord.y))
+            walls_to_carve = list(self.all_coords)
 
             past_seen_carved_coords = set([])
 
@@ -156,6 +180,8 @@ class GPacWorld:
                 self.pill_coords.add(c)
                 break
 
+        self.pill_cells = set([self.coordinate_table.get_cell(c) for c in self.pill_coords])
+
 
     def move_pacman(self, directions):
         """Moves all pacman in self.pacman_coords in directions[i] (indexed the same 
@@ -166,23 +192,8 @@ class GPacWorld:
                 # No action needed
                 return
 
-            new_coord = coord_class.Coordinate(self.pacman_coords[index].x, self.pacman_coords[index].y)
-            
-            # Adjust new_coord depending on pacman's desired direction
-            if direction == d.Direction.UP:
-                new_coord.y += 1
-
-            elif direction == d.Direction.DOWN:
-                new_coord.y -= 1
-
-            elif direction == d.Direction.LEFT:
-                new_coord.x -= 1
-
-            elif direction == d.Direction.RIGHT:
-                new_coord.x += 1
-            
-            self.prev_pacman_coords[index] = coord_class.Coordinate(self.pacman_coords[index].x, self.pacman_coords[index].y)
-            self.pacman_coords[index] = coord_class.Coordinate(new_coord.x, new_coord.y)
+            self.prev_pacman_coords[index] = self.pacman_coords[index]
+            self.pacman_coords[index] = self.get_adj_coord(self.pacman_coords[index], direction)
 
 
     def move_ghost(self, ghost_id, direction):
@@ -193,23 +204,18 @@ class GPacWorld:
             # This ghost does not exist
             return
 
-        new_coord = coord_class.Coordinate(self.ghost_coords[ghost_id].x, self.ghost_coords[ghost_id].y)
-        
-        # Adjust new_coord depending on pacman's desired direction
-        if direction == d.Direction.UP:
-            new_coord.y += 1
+        self.prev_ghost_coords[ghost_id] = self.ghost_coords[ghost_id]
+        self.ghost_coords[ghost_id] = self.get_adj_coord(self.ghost_coords[ghost_id], direction)
 
-        elif direction == d.Direction.DOWN:
-            new_coord.y -= 1
+        if self.ghost_index:
+            self.ghost_index.move(self.coordinate_table.get_cell(self.prev_ghost_coords[ghost_id]), self.coordinate_table.get_cell(self.ghost_coords[ghost_id]))
 
-        elif direction == d.Direction.LEFT:
-            new_coord.x -= 1
 
-        elif direction == d.Direction.RIGHT:
-            new_coord.x += 1
-        
-        self.prev_ghost_coords[ghost_id] = coord_class.Coordinate(self.ghost_coords[ghost_id].x, self.ghost_coords[ghost_id].y)
-        self.ghost_coords[ghost_id] = coord_class.Coordinate(new_coord.x, new_coord.y)
+    def get_adj_coord(self, coord, direction):
+        """Returns the (interned) coordinate reached by moving from coord in direction."""
+        offset = passability_grid_class.MOVE_OFFSETS.get(direction, (0, 0))
+
+        return self.coordinate_table.get(coord.x + offset[0], coord.y + offset[1])
 
 
     def check_game_over(self):
@@ -280,16 +286,16 @@ class GPacWorld:
         adj_coords = []
 
         if not coord.x == 0:
-            adj_coords.append(coord_class.Coordinate(coord.x - 1, coord.y))
+            adj_coords.append(self.coordinate_table.get(coord.x - 1, coord.y))
 
         if not coord.x == self.width - 1:
-            adj_coords.append(coord_class.Coordinate(coord.x + 1, coord.y))
+            adj_coords.append(self.coordinate_table.get(coord.x + 1, coord.y))
         
         if not coord.y == 0:
-            adj_coords.append(coord_class.Coordinate(coord.x, coord.y - 1))
+            adj_coords.append(self.coordinate_table.get(coord.x, coord.y - 1))
         
         if not coord.y == self.height - 1:
-            adj_coords.append(coord_class.Coordinate(coord.x, coord.y + 1))
+            adj_coords.append(self.coordinate_table.get(coord.x, coord.y + 1))
         
         return adj_coords
 
@@ -315,13 +321,40 @@ class GPacWorld:
             return
 
         if random.random() <= self.fruit_spawn_prob:
-            possible_coords = []
-            for coord in list(self.all_coords.difference(set(self.pacman_coords)).difference(self.wall_coords).difference(self.pill_coords)):
-                possible_coords.append(coord_class.Coordinate(coord.x, coord.y))
+            possible_coords = list(self.all_coords.difference(set(self.pacman_coords)).difference(self.wall_coords).difference(self.pill_coords))
 
             random.shuffle(possible_coords)
 
             for possible_fruit_coord in possible_coords:
                 self.fruit_coord.add(possible_fruit_coord)
+                self.fruit_cell = self.coordinate_table.get_cell(possible_fruit_coord)
                 break
 
+
+    def has_pill(self, coord):
+        """Returns True if a pill lies at coord, False otherwise."""
+        return self.coordinate_table.get_cell(coord) in self.pill_cells
+
+
+    def remove_pill(self, coord):
+        """Removes the pill at coord from the world."""
+        cell = self.coordinate_table.get_cell(coord)
+
+        self.pill_coords.remove(coord)
+        self.pill_cells.remove(cell)
+        self.pill_distance_field.remove_source(cell)
+
+        if self.pill_maze_distance_field:
+            self.pill_maze_distance_field.remove_source(cell)
+
+
+    def has_fruit(self, coord):
+        """Returns True if the fruit lies at coord, False otherwise."""
+        return self.coordinate_table.get_cell(coord) == self.fruit_cell
+
+
+    def remove_fruit(self, coord):
+        """Removes the fruit at coord from the world."""
+        self.fruit_coord.remove(coord)
+        self.fruit_cell = passability_grid_class.NO_CELL
+
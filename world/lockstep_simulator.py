@@ -0,0 +1,281 @@
+import controllers.direction as d
+import controllers.feature_frame as feature_frame_class
+import random
+import world.coordinate as coord_class
+import world.passability_grid as passability_grid_class
+
+
+# Constant declarations
+ARBITRARY_LARGE_NUMBER = 99999
+
+NO_CELL = passability_grid_class.NO_CELL
+
+
+class LockstepSimulator:
+    def __init__(self, config, worlds):
+        """Initializes the LockstepSimulator class.
+
+        Where config is a Config object and worlds is a list of freshly generated
+        GPacWorld objects.
+
+        The simulator holds every world as flat, cell indexed data (where the cell
+        of coordinate (x, y) is y * width + x): a passability mask, a set of pill cells,
+        pacman and ghost cells, the fruit cell and the time remaining. Each call to
+        step() advances every live game by one tick, following the same rules as
+        GPDriver.move_units() and GPacWorld.check_game_over().
+        """
+        self.config = config
+        self.worlds = worlds
+
+        self.width = int(self.config.settings['width'])
+        self.height = int(self.config.settings['height'])
+        self.num_cells = self.width * self.height
+        self.fruit_spawn_prob = float(self.config.settings['fruit spawn probability'])
+        self.fruit_score = int(self.config.settings['fruit score'])
+
+        self.coordinate_table = coord_class.get_coordinate_table(self.width, self.height)
+
+        self.passability_grids = []
+        self.pill_cells = []
+        self.pacman_cells = []
+        self.prev_pacman_cells = []
+        self.ghost_cells = []
+        self.prev_ghost_cells = []
+        self.fruit_cells = []
+        self.time_remaining = []
+        self.num_pills_consumed = []
+        self.num_fruit_consumed = []
+        self.scores = []
+
+        # Per-cell move tables of each world (see PassabilityGrid)
+        self.ghost_moves = []
+        self.num_adj_walls = []
+
+        # Nearest pill distance fields of each world (see GPacWorld)
+        self.pill_distance_fields = []
+        self.pill_maze_distance_fields = []
+
+        # Ghost spatial indices of each world (see GPacWorld)
+        self.ghost_indices = []
+
+        for world in self.worlds:
+            # Note: the world's PassabilityGrid uses the same cell indexing
+            self.passability_grids.append(world.passability_grid.cells)
+            self.pill_cells.append(set(world.pill_cells))
+            self.pacman_cells.append([self.get_cell(coord) for coord in world.pacman_coords])
+            self.prev_pacman_cells.append([self.get_cell(coord) for coord in world.prev_pacman_coords])
+            self.ghost_cells.append([self.get_cell(coord) for coord in world.ghost_coords])
+            self.prev_ghost_cells.append([self.get_cell(coord) for coord in world.prev_ghost_coords])
+            self.fruit_cells.append(world.fruit_cell)
+            self.time_remaining.append(world.time_remaining)
+            self.num_pills_consumed.append(world.num_pills_consumed)
+            self.num_fruit_consumed.append(world.num_fruit_consumed)
+            self.scores.append(world.score)
+            self.ghost_moves.append(world.passability_grid.ghost_moves)
+            self.num_adj_walls.append(world.passability_grid.num_adj_walls)
+            self.pill_distance_fields.append(world.pill_distance_field)
+            self.pill_maze_distance_fields.append(world.pill_maze_distance_field)
+            self.ghost_indices.append(world.ghost_index)
+
+        self.live_worlds = [index for index in range(len(self.worlds)) if not self.check_game_over(index)]
+
+
+    def get_cell(self, coord):
+        """Returns the cell of the given coordinate."""
+        return coord.y * self.width + coord.x
+
+
+    def get_coord(self, cell):
+        """Returns the interned Coordinate object of the given cell."""
+        return self.coordinate_table.coords[cell]
+
+
+    def check_game_over(self, index):
+        """Returns True if the game in world index is over, False otherwise.
+
+        The conditions are those of GPacWorld.check_game_over().
+        """
+        ghost_cells = self.ghost_cells[index]
+        prev_ghost_cells = self.prev_ghost_cells[index]
+
+        for pacman_index, pacman_cell in enumerate(self.pacman_cells[index]):
+            if pacman_cell in ghost_cells:
+                return True
+
+            prev_pacman_cell = self.prev_pacman_cells[index][pacman_index]
+
+            for ghost_index in range(len(ghost_cells)):
+                if prev_pacman_cell == ghost_cells[ghost_index] and pacman_cell == prev_ghost_cells[ghost_index]:
+                    return True
+
+        if not len(self.pill_cells[index]):
+            return True
+
+        if not self.time_remaining[index]:
+            return True
+
+        return False
+
+
+    def randomly_spawn_fruit(self, index):
+        """Probabilistically spawns a fruit in world index, following the rules
+        of GPacWorld.randomly_spawn_fruit().
+        """
+        if self.fruit_cells[index] != NO_CELL:
+            # A fruit already exists
+            return
+
+        if random.random() <= self.fruit_spawn_prob:
+            passability_grid = self.passability_grids[index]
+            pill_cells = self.pill_cells[index]
+            pacman_cells = self.pacman_cells[index]
+
+            possible_cells = [cell for cell in range(self.num_cells) if passability_grid[cell] and not cell in pill_cells and not cell in pacman_cells]
+
+            if possible_cells:
+                self.fruit_cells[index] = random.choice(possible_cells)
+
+
+    def get_candidates(self, index):
+        """Returns the candidate moves of world index and their feature matrix.
+
+        The candidates are a list (one entry per pacman) of lists of
+        (direction, destination cell) pairs. The feature matrix holds one row
+        (see PacmanController.get_features()) per candidate move, in the same order.
+        """
+        fruit_cells = [self.fruit_cells[index]] if self.fruit_cells[index] != NO_CELL else []
+
+        # Note: as in GPDriver.update_game_state(), the number of adjacent walls
+        # is always that of the first pacman's current cell
+        num_adj_walls = self.num_adj_walls[index][self.pacman_cells[index][0]]
+
+        feature_frame = feature_frame_class.FeatureFrame(self.worlds[index].passability_grid, self.pacman_cells[index], self.ghost_cells[index],
+            fruit_cells, num_adj_walls, self.pill_distance_fields[index], self.pill_maze_distance_fields[index], self.ghost_indices[index])
+
+        return feature_frame.candidates, feature_frame.features
+
+
+    def step(self, rate_candidates):
+        """Advances every live game by one tick.
+
+        Where rate_candidates is a function that takes a list holding one feature
+        matrix per world (empty for finished worlds) and returns a list holding,
+        for each world, the ratings of the rows of its feature matrix.
+
+        Returns True if any game is still live after this tick, False otherwise.
+        """
+        features = [[] for _ in range(len(self.worlds))]
+        candidates = {}
+
+        for index in self.live_worlds:
+            self.randomly_spawn_fruit(index)
+            candidates[index], features[index] = self.get_candidates(index)
+
+        ratings = rate_candidates(features)
+
+        for index in self.live_worlds:
+            self.move_pacmen(index, candidates[index], ratings[index])
+            self.move_ghosts(index)
+            self.time_remaining[index] -= 1
+            self.update_pills_and_fruit(index)
+            self.update_score(index)
+
+            self.worlds[index].world_file.save_snapshot([self.get_coord(cell) for cell in self.pacman_cells[index]],
+                [self.get_coord(cell) for cell in self.ghost_cells[index]],
+                [self.get_coord(self.fruit_cells[index])] if self.fruit_cells[index] != NO_CELL else [],
+                self.time_remaining[index], self.scores[index])
+
+        finished_worlds = [index for index in self.live_worlds if self.check_game_over(index)]
+
+        for index in finished_worlds:
+            self.write_back(index)
+
+        self.live_worlds = [index for index in self.live_worlds if not index in finished_worlds]
+
+        return len(self.live_worlds) > 0
+
+
+    def move_pacmen(self, index, candidates, ratings):
+        """Moves the pacmen of world index along their best rated candidate moves."""
+        rating_index = 0
+
+        for pacman_index, moves in enumerate(candidates):
+            best_rating = -1 * ARBITRARY_LARGE_NUMBER
+            best_move = (d.Direction.NONE, self.pacman_cells[index][pacman_index])
+
+            for move in moves:
+                if ratings[rating_index] > best_rating:
+                    best_rating = ratings[rating_index]
+                    best_move = move
+
+                rating_index += 1
+
+            if best_move[0] == d.Direction.NONE:
+                # Note: as in GPacWorld.move_pacman(), remaining pacmen do not move
+                break
+
+            self.prev_pacman_cells[index][pacman_index] = self.pacman_cells[index][pacman_index]
+            self.pacman_cells[index][pacman_index] = best_move[1]
+
+
+    def move_ghosts(self, index):
+        """Moves each ghost of world index in a random valid direction."""
+        ghost_moves = self.ghost_moves[index]
+        ghost_cells = self.ghost_cells[index]
+
+        for ghost_index, ghost_cell in enumerate(ghost_cells):
+            self.prev_ghost_cells[index][ghost_index] = ghost_cell
+
+            if ghost_moves[ghost_cell]:
+                ghost_cells[ghost_index] = random.choice(ghost_moves[ghost_cell])[1]
+
+                if self.ghost_indices[index]:
+                    self.ghost_indices[index].move(ghost_cell, ghost_cells[ghost_index])
+
+
+    def update_pills_and_fruit(self, index):
+        """Consumes the pills and fruit under the pacmen of world index."""
+        pill_cells = self.pill_cells[index]
+
+        for pacman_cell in self.pacman_cells[index]:
+            if pacman_cell in pill_cells:
+                pill_cells.remove(pacman_cell)
+                self.pill_distance_fields[index].remove_source(pacman_cell)
+
+                if self.pill_maze_distance_fields[index]:
+                    self.pill_maze_distance_fields[index].remove_source(pacman_cell)
+                self.num_pills_consumed[index] += 1
+
+            if pacman_cell == self.fruit_cells[index]:
+                self.fruit_cells[index] = NO_CELL
+                self.num_fruit_consumed[index] += 1
+
+
+    def update_score(self, index):
+        """Updates the score of world index, following GPacWorld.update_score()."""
+        num_pills_consumed = self.num_pills_consumed[index]
+        num_pills_remaining = len(self.pill_cells[index])
+
+        self.scores[index] = int((num_pills_consumed / (num_pills_consumed + num_pills_remaining)) * 100) + (self.num_fruit_consumed[index] * self.fruit_score)
+
+        if not num_pills_remaining:
+            # No more pills in the world
+            self.scores[index] += self.time_remaining[index] // self.worlds[index].total_time
+
+
+    def write_back(self, index):
+        """Copies the final state of world index back into its GPacWorld object."""
+        world = self.worlds[index]
+
+        world.pacman_coords = [self.get_coord(cell) for cell in self.pacman_cells[index]]
+        world.prev_pacman_coords = [self.get_coord(cell) for cell in self.prev_pacman_cells[index]]
+        world.ghost_coords = [self.get_coord(cell) for cell in self.ghost_cells[index]]
+        world.prev_ghost_coords = [self.get_coord(cell) for cell in self.prev_ghost_cells[index]]
+        world.pill_coords = set([self.get_coord(cell) for cell in self.pill_cells[index]])
+        world.pill_cells = set(self.pill_cells[index])
+        world.fruit_coord = set([self.get_coord(self.fruit_cells[index])]) if self.fruit_cells[index] != NO_CELL else set([])
+        world.fruit_cell = self.fruit_cells[index]
+        world.time_remaining = self.time_remaining[index]
+        world.num_pills_consumed = self.num_pills_consumed[index]
+        world.num_fruit_consumed = self.num_fruit_consumed[index]
+        world.score = self.scores[index]
@@ -0,0 +1,95 @@
+import array
+import collections
+
+
+# Constant declarations
+UNREACHABLE = 65535
+
+ARBITRARY_LARGE_NUMBER = 99999
+
+
+class MazeDistances:
+    def __init__(self, passability_grid, max_num_rows=0):
+        """Initializes the MazeDistances class.
+
+        Where passability_grid is the PassabilityGrid of a world.
+
+        MazeDistances provides true shortest-path (maze) distances between the
+        open cells of a world. The distances from a source cell are computed by
+        a breadth-first search the first time that cell is queried and are then
+        cached as a compact array of unsigned 16-bit integers, so every later
+        query from the same source is a constant time lookup.
+
+        If max_num_rows is not 0, at most max_num_rows rows are cached, the least
+        recently used being evicted first, bounding the memory of a world to
+        max_num_rows * num_cells 16-bit integers.
+        """
+        self.passability_grid = passability_grid
+        self.max_num_rows = max_num_rows
+        self.rows = collections.OrderedDict()
+
+
+    def get_row(self, source_cell):
+        """Returns the array of maze distances from source_cell to every cell.
+
+        Walls and cells that cannot be reached hold UNREACHABLE.
+        """
+        row = self.rows.get(source_cell)
+
+        if row:
+            self.rows.move_to_end(source_cell)
+            return row
+
+        open_adj_cells = self.passability_grid.open_adj_cells
+
+        row = array.array('H', [UNREACHABLE]) * self.passability_grid.num_cells
+        row[source_cell] = 0
+
+        cell_queue = collections.deque([source_cell])
+
+        while cell_queue:
+            cell = cell_queue.popleft()
+            distance = row[cell] + 1
+
+            for adj_cell in open_adj_cells[cell]:
+                if row[adj_cell] == UNREACHABLE:
+                    row[adj_cell] = distance
+                    cell_queue.append(adj_cell)
+
+        self.rows[source_cell] = row
+
+        if self.max_num_rows and len(self.rows) > self.max_num_rows:
+            # Evict the least recently used row
+            self.rows.popitem(last=False)
+
+        return row
+
+
+    def get_distance(self, cell1, cell2):
+        """Returns the maze distance between the given cells."""
+        return self.get_row(cell1)[cell2]
+
+
+    def get_nearest_distance(self, cell, cells_to_search):
+        """Returns the maze distance between cell and the nearest of cells_to_search.
+
+        If none of cells_to_search can be reached, ARBITRARY_LARGE_NUMBER is returned.
+
+        Note: this takes time linear in the number of cells_to_search, so the
+        nearest ghost and fruit maze terminals are O(num ghosts) and O(num fruit)
+        per query. Unlike pills, ghosts move every tick, so a multi-source field
+        (like the world's nearest pill DistanceField) would cost a breadth-first
+        search over the whole maze per tick, which only pays off with far more
+        ghosts than pacman candidate moves.
+        """
+        row = self.get_row(cell)
+
+        min_distance = UNREACHABLE
+        for other_cell in cells_to_search:
+            if row[other_cell] < min_distance:
+                min_distance = row[other_cell]
+
+        if min_distance == UNREACHABLE:
+            return ARBITRARY_LARGE_NUMBER
+
+        return min_distance
@@ -0,0 +1,116 @@
+import controllers.direction as d
+import world.coordinate as coord_class
+import world.maze_distances as maze_distances_class
+
+
+# Constant declarations
+# Note: the move order matches POSSIBLE_MOVES in the pacman controller, which
+# determines how ties between equally rated moves are broken
+PACMAN_MOVES = [d.Direction.NONE, d.Direction.UP, d.Direction.DOWN,
+    d.Direction.LEFT, d.Direction.RIGHT]
+
+NO_CELL = -1
+
+MOVE_OFFSETS = {
+    d.Direction.NONE: (0, 0),
+    d.Direction.UP: (0, 1),
+    d.Direction.DOWN: (0, -1),
+    d.Direction.LEFT: (-1, 0),
+    d.Direction.RIGHT: (1, 0)
+}
+
+
+class PassabilityGrid:
+    def __init__(self, width, height, wall_coords, max_num_maze_distance_rows=0):
+        """Initializes the PassabilityGrid class.
+
+        Where wall_coords is an iterable of wall Coordinate objects, and
+        max_num_maze_distance_rows bounds the maze distance cache (see
+        MazeDistances; 0 for no bound).
+
+        The grid holds one byte per cell (where the cell of coordinate (x, y) is
+        y * width + x) which is 1 if the cell can be occupied by a unit and 0 if
+        it holds a wall, so that movement validity checks take constant time.
+
+        Per-cell move tables are computed alongside the grid:
+            self.pacman_moves[cell] lists the legal (direction, destination cell)
+                pairs from cell in PACMAN_MOVES order (including staying put)
+            self.ghost_moves[cell] lists the same pairs, excluding staying put
+            self.num_adj_walls[cell] is the number of walls adjacent to cell
+            self.adj_cells[cell] lists the cells adjacent to cell inside the
+                world, walls included (steps between them measure Manhattan distance)
+            self.open_adj_cells[cell] lists the open cells adjacent to cell
+                (steps between them measure maze distance)
+        """
+        self.width = width
+        self.height = height
+        self.num_cells = self.width * self.height
+
+        self.cells = bytearray([1]) * self.num_cells
+
+        # Interned coordinates of every cell
+        self.coordinate_table = coord_class.get_coordinate_table(self.width, self.height)
+
+        for coord in wall_coords:
+            self.cells[coord.y * self.width + coord.x] = 0
+
+        self.init_move_tables()
+
+        # Maze distances between cells, computed on demand
+        self.maze_distances = maze_distances_class.MazeDistances(self, max_num_maze_distance_rows)
+
+
+    def init_move_tables(self):
+        """Computes the per-cell move and adjacent wall tables."""
+        self.pacman_moves = []
+        self.ghost_moves = []
+        self.num_adj_walls = []
+        self.adj_cells = []
+        self.open_adj_cells = []
+
+        for cell in range(self.num_cells):
+            x = cell % self.width
+            y = cell // self.width
+
+            moves = []
+            adj_walls = 0
+            adj_cells = []
+
+            for direction in PACMAN_MOVES:
+                new_x = x + MOVE_OFFSETS[direction][0]
+                new_y = y + MOVE_OFFSETS[direction][1]
+
+                if self.is_passable(new_x, new_y):
+                    moves.append((direction, self.get_cell(new_x, new_y)))
+
+                elif direction != d.Direction.NONE and self.is_wall(new_x, new_y):
+                    adj_walls += 1
+
+                if direction != d.Direction.NONE and self.is_inside(new_x, new_y):
+                    adj_cells.append(self.get_cell(new_x, new_y))
+
+            self.pacman_moves.append(moves)
+            self.ghost_moves.append([move for move in moves if move[0] != d.Direction.NONE])
+            self.num_adj_walls.append(adj_walls)
+            self.adj_cells.append(adj_cells)
+            self.open_adj_cells.append([move[1] for move in self.ghost_moves[cell]])
+
+
+    def get_cell(self, x, y):
+        """Returns the cell of coordinate (x, y)."""
+        return y * self.width + x
+
+
+    def is_inside(self, x, y):
+        """Returns True if (x, y) lies inside the world, False otherwise."""
+        return x >= 0 and y >= 0 and x < self.width and y < self.height
+
+
+    def is_passable(self, x, y):
+        """Returns True if (x, y) lies inside the world and is not a wall, False otherwise."""
+        return x >= 0 and y >= 0 and x < self.width and y < self.height and self.cells[y * self.width + x] == 1
+
+
+    def is_wall(self, x, y):
+        """Returns True if (x, y) lies inside the world and is a wall, False otherwise."""
+        return x >= 0 and y >= 0 and x < self.width and y < self.height and self.cells[y * self.width + x] == 0
@@ -0,0 +1,131 @@
+# Constant declarations
+BUCKET_SIZE = 8
+
+# Note: below this many objects, scanning them all is cheaper than searching buckets
+MIN_INDEXED_OBJECTS = 32
+
+ARBITRARY_LARGE_NUMBER = 99999
+
+
+class SpatialIndex:
+    def __init__(self, width, height, cells=(), bucket_size=BUCKET_SIZE):
+        """Initializes the SpatialIndex class.
+
+        Where cells is an iterable of the (possibly repeated) cells holding the
+        objects to index, using the same cell indexing as PassabilityGrid.
+
+        The world is divided into square buckets of bucket_size x bucket_size
+        cells, each listing the objects inside it. Objects are inserted, removed
+        and moved in constant time, and a nearest object query only inspects the
+        rings of buckets around the query cell until no closer object can exist,
+        so its cost depends on the local object density rather than the size of
+        the world.
+        """
+        self.width = width
+        self.height = height
+        self.bucket_size = bucket_size
+
+        self.num_bucket_cols = (self.width + self.bucket_size - 1) // self.bucket_size
+        self.num_bucket_rows = (self.height + self.bucket_size - 1) // self.bucket_size
+
+        self.buckets = [[] for _ in range(self.num_bucket_cols * self.num_bucket_rows)]
+        self.num_objects = 0
+
+        for cell in cells:
+            self.insert(cell)
+
+
+    def get_bucket(self, cell):
+        """Returns the bucket (list of cells) containing cell."""
+        return self.buckets[(cell // self.width) // self.bucket_size * self.num_bucket_cols + (cell % self.width) // self.bucket_size]
+
+
+    def insert(self, cell):
+        """Inserts an object at cell."""
+        self.get_bucket(cell).append(cell)
+        self.num_objects += 1
+
+
+    def remove(self, cell):
+        """Removes an object at cell."""
+        self.get_bucket(cell).remove(cell)
+        self.num_objects -= 1
+
+
+    def move(self, old_cell, new_cell):
+        """Moves an object from old_cell to new_cell."""
+        if old_cell != new_cell:
+            self.remove(old_cell)
+            self.insert(new_cell)
+
+
+    def get_nearest_distance(self, cell):
+        """Returns the Manhattan distance between cell and the nearest object.
+
+        If there are no objects, ARBITRARY_LARGE_NUMBER is returned.
+        """
+        min_distance = ARBITRARY_LARGE_NUMBER
+
+        if not self.num_objects:
+            return min_distance
+
+        x = cell % self.width
+        y = cell // self.width
+        bucket_col = x // self.bucket_size
+        bucket_row = y // self.bucket_size
+
+        ring = 0
+
+        while True:
+            for bucket in self.get_ring_buckets(bucket_col, bucket_row, ring):
+                for other_cell in bucket:
+                    distance = abs(x - other_cell % self.width) + abs(y - other_cell // self.width)
+
+                    if distance < min_distance:
+                        min_distance = distance
+
+            # Find the smallest distance between cell and any cell outside the
+            # buckets searched so far (sides at the edge of the world are ignored)
+            min_unsearched_distance = ARBITRARY_LARGE_NUMBER
+
+            if bucket_col - ring > 0:
+                min_unsearched_distance = min(min_unsearched_distance, x - (bucket_col - ring) * self.bucket_size + 1)
+
+            if bucket_col + ring < self.num_bucket_cols - 1:
+                min_unsearched_distance = min(min_unsearched_distance, (bucket_col + ring + 1) * self.bucket_size - x)
+
+            if bucket_row - ring > 0:
+                min_unsearched_distance = min(min_unsearched_distance, y - (bucket_row - ring) * self.bucket_size + 1)
+
+            if bucket_row + ring < self.num_bucket_rows - 1:
+                min_unsearched_distance = min(min_unsearched_distance, (bucket_row + ring + 1) * self.bucket_size - y)
+
+            if min_distance <= min_unsearched_distance:
+                # No closer object can exist (or the whole world has been searched)
+                return min_distance
+
+            ring += 1
+
+
+    def get_ring_buckets(self, bucket_col, bucket_row, ring):
+        """Returns the buckets lying exactly ring buckets away (in both axes, at
+        most) from the bucket at (bucket_col, bucket_row).
+        """
+        if not ring:
+            return [self.buckets[bucket_row * self.num_bucket_cols + bucket_col]]
+
+        ring_buckets = []
+
+        for row in range(max(bucket_row - ring, 0), min(bucket_row + ring, self.num_bucket_rows - 1) + 1):
+            if row == bucket_row - ring or row == bucket_row + ring:
+                # Top and bottom edges of the ring
+                cols = range(max(bucket_col - ring, 0), min(bucket_col + ring, self.num_bucket_cols - 1) + 1)
+
+            else:
+                # Left and right edges of the ring
+                cols = [col for col in (bucket_col - ring, bucket_col + ring) if col >= 0 and col < self.num_bucket_cols]
+
+            for col in cols:
+                ring_buckets.append(self.buckets[row * self.num_bucket_cols + col])
+
+        return ring_buckets